@@ -0,0 +1,14 @@
+# analytics.py
+# Standalone Cohort Analytics page. The view itself lives in feature_analytics,
+# which the homepage also renders, so there is one copy of it.
+import streamlit as st
+
+from feature_analytics import cohort_analytics
+
+def app():
+    st.set_page_config(page_title="Cohort Analytics", page_icon="📈")
+    cohort_analytics()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,164 @@
+# batch.py
+# Headless batch runner for whole-faculty result processing.
+# Reuses the View Grades and GPA Calculator pipelines without Streamlit, so it
+# starts fast and can run under cron:
+#
+#   python batch.py --index index.csv --manifest modules.csv --out results/
+#
+# The manifest is a CSV with Module, Credit and PDF columns (PDF paths are
+# relative to the manifest) and an optional Engine column ("regex"/"layout").
+import argparse
+import os
+import re
+import sys
+from contextlib import nullcontext
+
+import pandas as pd
+
+from extraction import (
+    DUPLICATE_RULES,
+    ENGINES,
+    MODULE_RESULTS_PATTERN,
+    VIEW_GRADES_PATTERN,
+    build_name_index,
+    combine_results,
+    extract_modules,
+    join_names,
+)
+from gpa_engine import compute_gpa
+from instrumentation import METRICS_ENABLED, recording
+from layout_extraction import has_header_row
+from uploads import SpooledPDF, file_digest
+
+FORMATS = ("csv", "parquet")
+
+
+def load_index(path):
+    index_df = pd.read_csv(path)
+    index_df.columns = index_df.columns.str.strip()
+    if "IndexNumber" not in index_df.columns or "Name" not in index_df.columns:
+        raise ValueError(f"{path} must have 'IndexNumber' and 'Name' columns")
+    return index_df
+
+
+def load_manifest(path, default_engine="regex"):
+    """Return [(module_name, credit, pdf_path, engine)] in manifest order."""
+    manifest = pd.read_csv(path)
+    manifest.columns = manifest.columns.str.strip()
+    missing = {"Module", "Credit", "PDF"} - set(manifest.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    if "Engine" not in manifest.columns:
+        manifest["Engine"] = default_engine
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    modules = []
+    for row in manifest.itertuples(index=False):
+        engine = str(row.Engine).strip() if pd.notna(row.Engine) else default_engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r} for module {row.Module}")
+        modules.append((
+            str(row.Module).strip(),
+            float(row.Credit),
+            os.path.join(base_dir, str(row.PDF).strip()),
+            engine,
+        ))
+    return modules
+
+
+def write_table(df, out_dir, name, formats):
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+        else:
+            df.to_parquet(path, index=False)
+
+
+def safe_filename(name):
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", name).strip("_") or "module"
+
+
+def run(index_path, manifest_path, out_dir, workers=None, duplicates="last",
+        formats=("csv",), default_engine="regex"):
+    """Run extraction, combine and GPA for one programme; returns the GPA leaderboard."""
+    index_df = load_index(index_path)
+    modules = load_manifest(manifest_path, default_engine)
+
+    # PDFs are passed by path, so pool workers open them instead of receiving
+    # whole books; the digest keys the parse cache
+    pdfs = [SpooledPDF(pdf_path, *file_digest(pdf_path)) for _, _, pdf_path, _ in modules]
+    engines = [engine for *_, engine in modules]
+    module_matches = extract_modules(pdfs, MODULE_RESULTS_PATTERN, workers=workers, engines=engines)
+
+    # View Grades reads with its own pattern, which needs whitespace before the
+    # grade, so glued tokens such as "CS1012A" are not split into CS1012 / A.
+    # Table columns are read without a pattern, so layout modules reuse their
+    # rows; only those without a header row fell back to the text pattern
+    view_matches = list(module_matches)
+    rescan = [i for i, (pdf, engine) in enumerate(zip(pdfs, engines))
+              if engine == "regex" or not has_header_row(pdf)]
+    for i, matches in zip(rescan, extract_modules([pdfs[i] for i in rescan], VIEW_GRADES_PATTERN, workers=workers)):
+        view_matches[i] = matches
+
+    os.makedirs(os.path.join(out_dir, "view_grades"), exist_ok=True)
+    name_index = build_name_index(index_df)
+    for (module_name, *_), matches in zip(modules, view_matches):
+        if not matches:
+            print(f"warning: no results found in {module_name}", file=sys.stderr)
+        # View Grades output: one name-sorted table per module, as the View Grades page shows it
+        write_table(
+            join_names(matches, name_index),
+            os.path.join(out_dir, "view_grades"), safe_filename(module_name), formats,
+        )
+
+    all_results, duplicates_df = combine_results(
+        index_df,
+        [(module_name, matches) for (module_name, *_), matches in zip(modules, module_matches)],
+        duplicates=duplicates,
+    )
+    if not duplicates_df.empty:
+        print(f"warning: {len(duplicates_df)} index numbers appear more than once in a module PDF",
+              file=sys.stderr)
+        write_table(duplicates_df, out_dir, "duplicates", formats)
+
+    module_credits = {module_name: credit for module_name, credit, *_ in modules}
+    gpa_df = compute_gpa(all_results, module_credits)
+
+    write_table(all_results, out_dir, "combined_results", formats)
+    write_table(gpa_df, out_dir, "gpa_results", formats)
+    return gpa_df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process module result PDFs without the web UI.")
+    parser.add_argument("--index", required=True, help="index.csv with IndexNumber and Name columns")
+    parser.add_argument("--manifest", required=True, help="CSV with Module, Credit, PDF[, Engine] columns")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="extraction worker processes (default: CPU count, 1 = serial)")
+    parser.add_argument("--duplicates", choices=DUPLICATE_RULES, default="last",
+                        help="which entry to keep when an index number repeats in a module PDF")
+    parser.add_argument("--engine", choices=ENGINES, default="regex",
+                        help="extraction engine for modules without an Engine column")
+    parser.add_argument("--format", choices=FORMATS, nargs="+", default=["csv"], dest="formats",
+                        help="output formats (parquet needs pyarrow)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="log per-stage time, sizes and peak memory as JSON lines on stderr")
+    args = parser.parse_args(argv)
+
+    try:
+        with recording("batch") if args.metrics or METRICS_ENABLED else nullcontext():
+            gpa_df = run(args.index, args.manifest, args.out, workers=args.workers,
+                         duplicates=args.duplicates, formats=args.formats,
+                         default_engine=args.engine)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Processed {len(gpa_df)} students into {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# benchmark.py
+# Synthetic-data benchmarks for the extraction and GPA pipeline.
+# Writes realistic results PDFs with PyMuPDF for N students x M modules, times
+# every stage (open, text extraction, regex, join, combine, GPA, rank) over a
+# sweep of sizes and saves the timings as JSON so runs can be compared between
+# commits. Runs offline and never touches the parse cache:
+#
+#   python benchmark.py --students 1000 10000 --modules 5 20 --out bench.json
+#   python benchmark.py --students 1000 --compare bench.json
+#
+# --save-inputs writes the generated index.csv and module PDFs for manual runs
+# of the UI or batch.py. --imports also measures cold-start import times of the
+# homepage and each feature module in fresh interpreters.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+import pandas as pd
+
+from extraction import (
+    MODULE_RESULTS_PATTERN,
+    build_name_index,
+    combine_results,
+    compiled,
+    join_names,
+    parse_matches,
+)
+from gpa_engine import GRADES, compute_gpa
+from profile_index import competition_rank
+
+STAGES = ("open", "text", "regex", "parse", "join", "combine", "gpa", "rank")
+# Modules whose cold import time is tracked; "homepage" also runs the landing screen
+IMPORT_MODULES = ("homepage", "feature_view_grades", "feature_gpa_calculator",
+                  "feature_profile", "feature_chatbot")
+
+# A4 page, in points
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+TOP_MARGIN, BOTTOM_MARGIN = 110, 50
+# Rough grade distribution of a real module (A+ ... I)
+GRADE_WEIGHTS = [4, 10, 10, 12, 14, 12, 10, 10, 7, 6, 5]
+
+
+# -----------------------------
+# Synthetic data
+def make_index(students, seed=0):
+    rng = random.Random(seed)
+    numbers = [f"{210000 + i}{chr(65 + rng.randrange(26))}" for i in range(students)]
+    names = [f"Student {i:06d}" for i in range(students)]
+    return pd.DataFrame({"IndexNumber": numbers, "Name": names})
+
+
+def make_grades(index_numbers, seed=0, coverage=0.97):
+    """(IndexNumber, Grade) rows for one module; a few students did not sit it."""
+    rng = random.Random(seed)
+    sat = [n for n in index_numbers if rng.random() < coverage]
+    return list(zip(sat, rng.choices(GRADES, weights=GRADE_WEIGHTS, k=len(sat))))
+
+
+def results_pdf(module_name, rows, rows_per_page=50):
+    """A results sheet: title, an Index Number / Grade header and one row per student."""
+    line = (PAGE_HEIGHT - TOP_MARGIN - BOTTOM_MARGIN) / rows_per_page
+    fontsize = min(10, line * 0.8)
+    doc = fitz.open()
+    for start in range(0, max(len(rows), 1), rows_per_page):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((72, 50), f"Examination results - {module_name}", fontsize=14)
+        page.insert_text((72, TOP_MARGIN - 20), "Index Number", fontsize=10)
+        page.insert_text((300, TOP_MARGIN - 20), "Grade", fontsize=10)
+        for i, (index_number, grade) in enumerate(rows[start:start + rows_per_page]):
+            y = TOP_MARGIN + (i + 1) * line
+            page.insert_text((72, y), index_number, fontsize=fontsize)
+            page.insert_text((300, y), grade, fontsize=fontsize)
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes
+
+
+def make_cohort(students, modules, rows_per_page=50, seed=0):
+    """Return (index_df, [(module_name, credit, pdf_bytes)])."""
+    index_df = make_index(students, seed)
+    rng = random.Random(seed)
+    cohort = []
+    for m in range(modules):
+        module_name = f"MOD{m + 1:03d}"
+        rows = make_grades(index_df["IndexNumber"].tolist(), seed=seed * 1000 + m)
+        cohort.append((module_name, rng.choice([1.0, 1.5, 2.0, 3.0]),
+                       results_pdf(module_name, rows, rows_per_page)))
+    return index_df, cohort
+
+
+def save_inputs(index_df, cohort, out_dir):
+    """Write index.csv, the module PDFs and a batch.py manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    index_df.to_csv(os.path.join(out_dir, "index.csv"), index=False)
+    for module_name, _, pdf_bytes in cohort:
+        with open(os.path.join(out_dir, f"{module_name}.pdf"), "wb") as f:
+            f.write(pdf_bytes)
+    pd.DataFrame(
+        [(module_name, credit, f"{module_name}.pdf") for module_name, credit, _ in cohort],
+        columns=["Module", "Credit", "PDF"],
+    ).to_csv(os.path.join(out_dir, "modules.csv"), index=False)
+
+
+# -----------------------------
+# Timing
+def run_stages(index_df, cohort, pattern=MODULE_RESULTS_PATTERN):
+    """Run the pipeline once; returns ({stage: seconds}, match count)."""
+    timings = {}
+    clock = time.perf_counter
+
+    t = clock()
+    docs = [fitz.open(stream=pdf_bytes, filetype="pdf") for _, _, pdf_bytes in cohort]
+    timings["open"] = clock() - t
+
+    t = clock()
+    texts = ["".join(page.get_text("text") for page in doc) for doc in docs]
+    timings["text"] = clock() - t
+    for doc in docs:
+        doc.close()
+
+    t = clock()
+    regex = compiled(pattern)
+    [regex.findall(text) for text in texts]
+    timings["regex"] = clock() - t
+
+    # Full serial parse as the UI runs it (open + streaming text + regex)
+    t = clock()
+    module_matches = [parse_matches(pdf_bytes, pattern) for _, _, pdf_bytes in cohort]
+    timings["parse"] = clock() - t
+
+    t = clock()
+    name_index = build_name_index(index_df)
+    for matches in module_matches:
+        join_names(matches, name_index)
+    timings["join"] = clock() - t
+
+    t = clock()
+    all_results, _ = combine_results(
+        index_df, [(module_name, matches) for (module_name, *_), matches in zip(cohort, module_matches)]
+    )
+    timings["combine"] = clock() - t
+
+    t = clock()
+    gpa_df = compute_gpa(all_results, {module_name: credit for module_name, credit, _ in cohort})
+    timings["gpa"] = clock() - t
+
+    t = clock()
+    competition_rank(gpa_df["GPA"])
+    timings["rank"] = clock() - t
+
+    return timings, sum(len(matches) for matches in module_matches)
+
+
+def bench_case(students, modules, rows_per_page=50, repeat=3, seed=0, inputs_dir=None):
+    t = time.perf_counter()
+    index_df, cohort = make_cohort(students, modules, rows_per_page, seed)
+    generate = time.perf_counter() - t
+    if inputs_dir:
+        save_inputs(index_df, cohort, os.path.join(inputs_dir, f"s{students}_m{modules}_p{rows_per_page}"))
+
+    samples = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        timings, match_count = run_stages(index_df, cohort)
+        for stage, seconds in timings.items():
+            samples[stage].append(seconds)
+
+    return {
+        "students": students,
+        "modules": modules,
+        "rows_per_page": rows_per_page,
+        "pages": _page_count(cohort),
+        "pdf_bytes": sum(len(pdf_bytes) for _, _, pdf_bytes in cohort),
+        "matches": match_count,
+        "generate_s": round(generate, 4),
+        "stages": {
+            stage: {"min_s": round(min(s), 6), "median_s": round(statistics.median(s), 6)}
+            for stage, s in samples.items()
+        },
+    }
+
+
+def _page_count(cohort):
+    pages = 0
+    for _, _, pdf_bytes in cohort:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            pages += doc.page_count
+    return pages
+
+
+def import_times(modules=IMPORT_MODULES, repeat=3):
+    """Median seconds to import each module in a fresh interpreter, and whether it pulled in fitz/pandas.
+
+    For "homepage" the landing screen is also rendered (bare mode, no server),
+    as an estimate of time to first paint.
+    """
+    snippet = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import {module}\n"
+        "imported = time.perf_counter() - start\n"
+        "{render}"
+        "print(imported, time.perf_counter() - start, 'fitz' in sys.modules, 'pandas' in sys.modules)\n"
+    )
+    repo = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in modules:
+        render = "homepage.main()\n" if module == "homepage" else ""
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", snippet.format(module=module, render=render)],
+                capture_output=True, text=True, cwd=repo, check=True,
+            ).stdout.splitlines()[-1].split()  # PyMuPDF may print warnings first
+            runs.append(out)
+        results[module] = {
+            "import_s": round(statistics.median(float(run[0]) for run in runs), 4),
+            "first_paint_s": round(statistics.median(float(run[1]) for run in runs), 4) if render else None,
+            "loads_fitz": runs[-1][2] == "True",
+            "loads_pandas": runs[-1][3] == "True",
+        }
+    return results
+
+
+def print_imports(imports):
+    print(f"{'module':<24} {'import s':>9} {'paint s':>8}  fitz  pandas")
+    for module, row in imports.items():
+        paint = f"{row['first_paint_s']:>8.3f}" if row["first_paint_s"] is not None else f"{'':>8}"
+        print(f"{module:<24} {row['import_s']:>9.3f} {paint}  {'yes' if row['loads_fitz'] else 'no':<5} "
+              f"{'yes' if row['loads_pandas'] else 'no'}")
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pymupdf": fitz.VersionBind,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+# -----------------------------
+# Reporting
+def case_key(case):
+    return case["students"], case["modules"], case["rows_per_page"]
+
+
+def print_report(cases, baseline=None):
+    """One line per case with median seconds per stage; ratios against a baseline run if given."""
+    previous = {case_key(case): case for case in (baseline or {}).get("cases", [])}
+    print(f"{'students':>9} {'modules':>7} {'pages':>6} " + " ".join(f"{stage:>9}" for stage in STAGES))
+    for case in cases:
+        cells = []
+        old = previous.get(case_key(case))
+        for stage in STAGES:
+            median = case["stages"][stage]["median_s"]
+            if old:
+                before = old["stages"].get(stage, {}).get("median_s")
+                cells.append(f"{median / before:>8.2f}x" if before else f"{'n/a':>9}")
+            else:
+                cells.append(f"{median:>9.4f}")
+        print(f"{case['students']:>9} {case['modules']:>7} {case['pages']:>6} " + " ".join(cells))
+    if baseline:
+        print(f"(ratios are median time vs {baseline['environment'].get('commit') or 'baseline'}; < 1 is faster)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the extraction and GPA pipeline on synthetic data.")
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 5000],
+                        help="cohort sizes to sweep")
+    parser.add_argument("--modules", type=int, nargs="+", default=[5, 20],
+                        help="module counts to sweep")
+    parser.add_argument("--rows-per-page", type=int, nargs="+", default=[50],
+                        help="result rows per PDF page to sweep")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (min and median are kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare against")
+    parser.add_argument("--save-inputs", metavar="DIR",
+                        help="also write each case's index.csv, PDFs and modules.csv under DIR")
+    parser.add_argument("--imports", action="store_true",
+                        help="also measure cold-start import times of the homepage and feature modules")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"error: cannot read {args.compare}: {e}", file=sys.stderr)
+            return 1
+
+    cases = []
+    for students in args.students:
+        for modules in args.modules:
+            for rows_per_page in args.rows_per_page:
+                print(f"running {students} students x {modules} modules, {rows_per_page} rows/page...",
+                      file=sys.stderr)
+                cases.append(bench_case(students, modules, rows_per_page, args.repeat, args.seed,
+                                        args.save_inputs))
+
+    report = {"environment": environment(), "repeat": args.repeat, "seed": args.seed, "cases": cases}
+    if args.imports:
+        report["imports"] = import_times(repeat=args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    print_report(cases, baseline)
+    if args.imports:
+        print_imports(report["imports"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
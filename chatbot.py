@@ -1,69 +1,79 @@
 # chatbot.py
 import streamlit as st
-import pandas as pd
+
+from choices import RESULT_SOURCES
+from insights import reply, student_insight
+from page_data import load_cohort_gpa_index, load_cohort_module_index, load_insights
+from results_store import ResultsStore
 
 def app():
     st.set_page_config(page_title="Grade Insights Chatbot", page_icon="🤖")
     st.title("🤖 Grade Insights Chatbot")
 
-    # Upload CSV files
-    combined_file = st.file_uploader("Upload Combined Results CSV", type="csv")
-    gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv")
+    source = st.radio("Results source", RESULT_SOURCES, horizontal=True)
+
+    if source == "Published cohort":
+        store = ResultsStore()
+        cohorts = store.list_cohorts()
+        if not cohorts:
+            st.info("No published cohorts yet. Publish one from the GPA Calculator.")
+            st.stop()
+        cohort_id = st.selectbox("Cohort", cohorts)
+
+        # Input index number
+        index_number = st.text_input("Enter your Index Number:")
+        if not index_number:
+            st.stop()
 
-    if not combined_file or not gpa_file:
-        st.info("Upload both combined results and GPA CSV files to start the chatbot.")
-        st.stop()
+        # Indexed single-student read instead of loading both tables
+        student = store.student(cohort_id, index_number)
+        if student is None:
+            st.error("Index Number not found!")
+            st.stop()
+        student_row, gpa_row = student
+        insight = student_insight(student_row, store.modules(cohort_id), gpa_row["GPA"], gpa_row["Rank"])
+        top = store.top(cohort_id, 1)
+        top_student = top.iloc[0] if len(top) else None
+        published_at = store.published_at(cohort_id)
+        gpa_index = load_cohort_gpa_index(cohort_id, published_at)
+        module_index = load_cohort_module_index(cohort_id, published_at)
+    else:
+        # Upload CSV files
+        combined_file = st.file_uploader("Upload Combined Results CSV", type="csv")
+        gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv")
 
-    combined_df = pd.read_csv(combined_file)
-    gpa_df = pd.read_csv(gpa_file)
+        if not combined_file or not gpa_file:
+            st.info("Upload both combined results and GPA CSV files to start the chatbot.")
+            st.stop()
 
-    # Input index number
-    index_number = st.text_input("Enter your Index Number:")
-    if not index_number:
-        st.stop()
+        # Insight table for the whole cohort, built once per pair of uploads and shared across sessions
+        insights = load_insights(combined_file, gpa_file)
 
-    if index_number not in combined_df["IndexNumber"].values:
-        st.error("Index Number not found!")
-        st.stop()
+        # Input index number
+        index_number = st.text_input("Enter your Index Number:")
+        if not index_number:
+            st.stop()
+
+        insight = insights.student(index_number)
+        if insight is None:
+            st.error("Index Number not found!")
+            st.stop()
+        top_student = insights.top_student
+        gpa_index = insights.gpa_index
+        module_index = insights.module_index
 
     # Initialize chat history in session state
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
 
-    # Function to generate response
-    def generate_response(user_input, combined_df, gpa_df, index_number):
-        student_row = combined_df[combined_df["IndexNumber"] == index_number].iloc[0]
-        gpa_row = gpa_df[gpa_df["IndexNumber"] == index_number].iloc[0]
-        grade_cols = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
-
-        user_input = user_input.lower()
-
-        if "weak" in user_input or "concentrate" in user_input:
-            grades = {col: student_row[col] for col in grade_cols}
-            weak_modules = [mod for mod, grade in grades.items() if grade in ["D", "C-", "C", "C+"]]
-            if weak_modules:
-                return "You should concentrate more on: " + ", ".join(weak_modules)
-            else:
-                return "Great! No weak modules found."
-        elif "strong" in user_input or "best" in user_input:
-            grades = {col: student_row[col] for col in grade_cols}
-            strong_modules = [mod for mod, grade in grades.items() if grade in ["A+", "A", "A-"]]
-            if strong_modules:
-                return "You performed well in: " + ", ".join(strong_modules)
-            else:
-                return "Keep improving! No modules with top grades yet."
-        elif "top" in user_input or "first" in user_input:
-            top_student = gpa_df.iloc[0]
-            return f"The top student in the batch is: {top_student['Name']} with GPA {top_student['GPA']}"
-        else:
-            return "Sorry, I can only answer questions about your strong/weak modules or top student."
-
     # Chat input
+    st.caption("Try: 'my weak modules', 'top 5', 'my percentile', 'top 3 in <module>', "
+               "'how many A+ in <module>', 'my rank in <module>', 'average of <module>'")
     user_input = st.text_input("Ask a question:", key="user_input")
     send_button = st.button("Send")
 
     if send_button and user_input.strip() != "":
-        response = generate_response(user_input, combined_df, gpa_df, index_number)
+        response = reply(user_input, insight, top_student, gpa_index, module_index)
         st.session_state.chat_history.append(("You", user_input))
         st.session_state.chat_history.append(("Bot", response))
 
@@ -0,0 +1,26 @@
+# choices.py
+# Option lists shared by the homepage features and the standalone pages.
+# Plain constants with no imports, so a page can use them without loading
+# any other page's dependencies.
+
+# Which result a student keeps when a module PDF lists them more than once
+DUPLICATE_CHOICES = {"Last entry": "last", "First entry": "first", "Best attempt": "best"}
+
+# Text pattern scans the flattened PDF text; table columns reads the
+# IndexNumber/Grade columns by position and falls back to the text pattern
+ENGINE_CHOICES = {"Text pattern": "regex", "Table columns": "layout"}
+
+# Profile and Chatbot read either a cohort published by the GPA Calculator
+# or a pair of uploaded CSVs
+RESULT_SOURCES = ["Published cohort", "Upload CSVs"]
+
+# Analytics reads a published cohort or an uploaded combined results CSV
+COMBINED_SOURCES = ["Published cohort", "Upload CSV"]
+
+# Module summary sort orders on the analytics page: (column, ascending)
+SORT_CHOICES = {
+    "Difficulty (hardest first)": ("Difficulty", True),
+    "Pass rate": ("PassRate", False),
+    "Mean grade point": ("MeanPoints", False),
+    "Students graded": ("Graded", False),
+}
@@ -0,0 +1,76 @@
+# cohort_analytics.py
+# Module-level statistics for a combined results table.
+# Grade distributions, pass rates, grade-point summaries, difficulty ranking
+# and module-to-module correlations are computed once per dataset as array
+# aggregations over the grade-code matrix. The analytics page keeps the
+# resulting object cached by dataset hash, so filters only slice these tables.
+import numpy as np
+import pandas as pd
+
+from gpa_engine import POINTS_LOOKUP, grade_codes
+from grades import GRADE_INDEX, GRADES, STRONG_MASK, UNGRADED, WEAK_MASK
+from profile_index import competition_rank
+
+# Lowest passing grade; grade codes run best first, so passing is code <= this
+PASS_GRADE = "C"
+PASS_CODE = GRADE_INDEX.get_loc(PASS_GRADE)
+# Students two modules must share before their correlation is reported
+MIN_CORRELATION_PAIRS = 5
+
+
+class CohortAnalytics:
+    """Per-module statistics for one combined results table."""
+
+    def __init__(self, combined_df):
+        self.modules = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
+        self.students = len(combined_df)
+        codes = grade_codes(combined_df, self.modules)
+        graded = codes != UNGRADED
+        points = POINTS_LOOKUP[codes]
+        count = graded.sum(axis=0)
+
+        # Grade counts per module: one bincount over (module, code) pairs
+        cols = np.broadcast_to(np.arange(len(self.modules)), codes.shape)[graded]
+        counts = np.bincount(cols * len(GRADES) + codes[graded],
+                             minlength=len(self.modules) * len(GRADES))
+        self.distribution = pd.DataFrame(
+            counts.reshape(len(self.modules), len(GRADES)),
+            index=pd.Index(self.modules, name="Module"), columns=GRADES,
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            def share(mask):
+                return 100.0 * (mask & graded).sum(axis=0) / count
+
+            mean = np.nansum(points, axis=0) / count
+            stats = pd.DataFrame({
+                "Graded": count,
+                "Ungraded": self.students - count,
+                "MeanPoints": mean,
+                "StdPoints": np.sqrt(np.nansum((points - mean) ** 2, axis=0) / count),
+                "PassRate": share(codes <= PASS_CODE),
+                "StrongRate": share(STRONG_MASK[codes]),
+                "WeakRate": share(WEAK_MASK[codes]),
+            }, index=self.distribution.index)
+        # Difficulty 1 is the module with the lowest mean grade point
+        stats["Difficulty"] = competition_rank(-stats["MeanPoints"]).array
+        self.module_stats = stats
+
+        # Pairwise Pearson correlation of grade points over students graded in both
+        self.correlation = pd.DataFrame(points, columns=self.distribution.index).corr(
+            min_periods=MIN_CORRELATION_PAIRS)
+        self.correlation.columns.name = None
+
+    def distribution_percent(self):
+        """Grade distribution as percentages of each module's graded students."""
+        totals = self.distribution.sum(axis=1).replace(0, np.nan)
+        return self.distribution.div(totals, axis=0) * 100
+
+    def correlated_pairs(self, modules=None, n=10):
+        """The n module pairs with the strongest correlation (either sign)."""
+        corr = self.correlation if modules is None else self.correlation.loc[modules, modules]
+        upper = np.triu(np.ones(corr.shape, dtype=bool), k=1)
+        pairs = corr.where(upper).stack().dropna().rename("Correlation")
+        pairs.index.names = ["Module", "Other"]
+        order = pairs.abs().sort_values(ascending=False, kind="stable").index
+        return pairs.reindex(order).head(n).reset_index()
@@ -0,0 +1,226 @@
+# cumulative.py
+# Cumulative GPA across semesters.
+# Per-semester combined results (the GPA Calculator's combined_results.csv)
+# are ingested one at a time. For every module only the counted attempt per
+# student is kept, as an int8 grade code plus its credit, with running
+# per-student point and credit totals. A re-sit therefore costs one delta per
+# affected student, and the whole history is never loaded as one wide frame.
+#
+#   python cumulative.py --credits credits.csv --out cumulative/ \
+#       --semester Y1S1=y1s1/combined_results.csv --semester Y1S2=y1s2/combined_results.csv
+#
+# credits.csv has Module and Credit columns covering every module.
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from gpa_engine import CREDIT_SCALE, POINT_UNITS, credit_units, gpa_from_totals, leaderboard
+from grades import UNGRADED, grade_codes
+from index_numbers import normalize_index_numbers
+from profile_index import competition_rank
+
+# Which attempt counts when a student has more than one grade for a module
+REPEAT_RULES = ("best", "latest")
+
+
+class CumulativeGPA:
+    """Running cumulative GPA for one programme, fed one semester at a time."""
+
+    def __init__(self, repeats="best"):
+        if repeats not in REPEAT_RULES:
+            raise ValueError(f"repeats must be one of {REPEAT_RULES}")
+        self.repeats = repeats
+        self.semesters = []
+        self._positions = {}  # IndexNumber -> student position
+        self._index_numbers = []
+        self._names = []
+        self.weighted = np.zeros(0, dtype=np.int64)
+        self.total_credits = np.zeros(0, dtype=np.int64)
+        # module -> [codes (int8), credit units (int64)] of the counted attempt per student
+        self._modules = {}
+
+    @property
+    def students(self):
+        return len(self._index_numbers)
+
+    @property
+    def modules(self):
+        return list(self._modules)
+
+    # -----------------------------
+    # Ingesting semesters
+    def add_semester(self, semester, combined_df, module_credits):
+        """Fold one semester's combined results into the running totals.
+
+        `module_credits` maps module -> credit; module columns without a
+        credit are skipped. Returns the semester report (see report()).
+        """
+        positions = self._register(combined_df)
+        semester_weighted = np.zeros(self.students, dtype=np.int64)
+        semester_credits = np.zeros(self.students, dtype=np.int64)
+
+        for module in [col for col in combined_df.columns if col in module_credits]:
+            codes = grade_codes(combined_df[module])
+            graded = (codes != UNGRADED) & (positions >= 0)
+            rows, codes = positions[graded], codes[graded]
+            units = credit_units(module_credits[module])
+
+            # Every attempt sat this semester counts towards the semester GPA
+            np.add.at(semester_weighted, rows, POINT_UNITS[codes] * units)
+            np.add.at(semester_credits, rows, units)
+
+            counted_codes, counted_units = self._module(module)
+            previous = counted_codes[rows]
+            if self.repeats == "best":
+                # Lower codes are better grades; a tie keeps the earlier attempt
+                replace = (previous == UNGRADED) | (codes < previous)
+            else:
+                replace = np.ones(len(rows), dtype=bool)
+            rows, codes, previous = rows[replace], codes[replace], previous[replace]
+
+            self.weighted[rows] -= POINT_UNITS[previous] * counted_units[rows]
+            self.total_credits[rows] -= counted_units[rows]
+            counted_codes[rows] = codes
+            counted_units[rows] = units
+            self.weighted[rows] += POINT_UNITS[codes] * units
+            self.total_credits[rows] += units
+
+        sat = np.zeros(self.students, dtype=bool)
+        sat[positions[positions >= 0]] = True
+        self.semesters.append(semester)
+        return self.report(semester, semester_weighted, semester_credits, sat)
+
+    def _register(self, combined_df):
+        """Positions of this semester's rows, adding students seen for the first time.
+
+        Rows without an IndexNumber, and repeats of a student within the
+        semester (the first row wins), get position -1.
+        """
+        keys = normalize_index_numbers(combined_df["IndexNumber"]).tolist()
+        positions = np.full(len(keys), -1, dtype=np.int64)
+        seen = set()
+        for i, (key, name) in enumerate(zip(keys, combined_df["Name"].tolist())):
+            if pd.isna(key) or key in seen:
+                continue
+            seen.add(key)
+            if key not in self._positions:
+                self._positions[key] = len(self._index_numbers)
+                self._index_numbers.append(key)
+                self._names.append(name)
+            positions[i] = self._positions[key]
+
+        grow = self.students - len(self.weighted)
+        if grow:
+            self.weighted = np.concatenate([self.weighted, np.zeros(grow, dtype=np.int64)])
+            self.total_credits = np.concatenate([self.total_credits, np.zeros(grow, dtype=np.int64)])
+            for module, (codes, units) in self._modules.items():
+                self._modules[module] = [
+                    np.concatenate([codes, np.full(grow, UNGRADED, dtype=np.int8)]),
+                    np.concatenate([units, np.zeros(grow, dtype=np.int64)]),
+                ]
+        return positions
+
+    def _module(self, module):
+        if module not in self._modules:
+            self._modules[module] = [
+                np.full(self.students, UNGRADED, dtype=np.int8),
+                np.zeros(self.students, dtype=np.int64),
+            ]
+        return self._modules[module]
+
+    # -----------------------------
+    # Outputs
+    def report(self, semester, semester_weighted, semester_credits, sat):
+        """Semester GPA, cumulative GPA and class rank for the students who sat this semester."""
+        cumulative = gpa_from_totals(self.weighted, self.total_credits)
+        rank = competition_rank(np.where(self.total_credits > 0, cumulative, np.nan))
+        rows = np.flatnonzero(sat)
+        return pd.DataFrame({
+            "IndexNumber": np.asarray(self._index_numbers, dtype=object)[rows],
+            "Name": np.asarray(self._names, dtype=object)[rows],
+            "Semester": semester,
+            "SemesterGPA": gpa_from_totals(semester_weighted, semester_credits)[rows],
+            "SemesterCredits": semester_credits[rows] / CREDIT_SCALE,
+            "CumulativeGPA": cumulative[rows],
+            "CumulativeCredits": self.total_credits[rows] / CREDIT_SCALE,
+            "Rank": rank.array[rows],
+        })
+
+    def leaderboard(self):
+        """Cumulative GPA leaderboard with competition rank; students with no graded credits get no rank."""
+        gpa_df = leaderboard(self._index_numbers, self._names, self.weighted, self.total_credits)
+        credits = pd.Series(self.total_credits, index=self._index_numbers)
+        graded = credits.reindex(gpa_df["IndexNumber"]).to_numpy() > 0
+        gpa_df["Rank"] = competition_rank(gpa_df["GPA"].where(graded)).array
+        return gpa_df
+
+
+# -----------------------------
+# Command line
+def load_credits(path):
+    credits = pd.read_csv(path)
+    credits.columns = credits.columns.str.strip()
+    missing = {"Module", "Credit"} - set(credits.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    return {str(m).strip(): float(c) for m, c in zip(credits["Module"], credits["Credit"])}
+
+
+def parse_semester(value):
+    name, sep, path = value.partition("=")
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError("expected NAME=path/to/combined_results.csv")
+    return name, path
+
+
+def run(semesters, credits_path, out_dir, repeats="best"):
+    """Fold the semesters in order and write semester_gpa.csv and cumulative_gpa.csv."""
+    module_credits = load_credits(credits_path)
+    engine = CumulativeGPA(repeats)
+    os.makedirs(out_dir, exist_ok=True)
+
+    semester_path = os.path.join(out_dir, "semester_gpa.csv")
+    for i, (semester, path) in enumerate(semesters):
+        combined_df = pd.read_csv(path)
+        combined_df.columns = combined_df.columns.str.strip()
+        if "IndexNumber" not in combined_df.columns or "Name" not in combined_df.columns:
+            raise ValueError(f"{path} must have 'IndexNumber' and 'Name' columns")
+        unknown = [col for col in combined_df.columns
+                   if col not in ("IndexNumber", "Name") and col not in module_credits]
+        if unknown:
+            print(f"warning: {semester}: no credit for {', '.join(unknown)}; skipped", file=sys.stderr)
+        # Semester reports are appended as they are produced
+        engine.add_semester(semester, combined_df, module_credits).to_csv(
+            semester_path, mode="w" if i == 0 else "a", header=i == 0, index=False,
+        )
+
+    gpa_df = engine.leaderboard()
+    gpa_df.to_csv(os.path.join(out_dir, "cumulative_gpa.csv"), index=False)
+    return gpa_df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cumulative GPA across semesters of combined results.")
+    parser.add_argument("--semester", type=parse_semester, action="append", required=True,
+                        metavar="NAME=CSV", help="a semester's combined results, oldest first (repeatable)")
+    parser.add_argument("--credits", required=True, help="CSV with Module and Credit columns")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--repeats", choices=REPEAT_RULES, default="best",
+                        help="which attempt counts when a module is taken more than once")
+    args = parser.parse_args(argv)
+
+    try:
+        gpa_df = run(args.semester, args.credits, args.out, args.repeats)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Cumulative GPA for {len(gpa_df)} students over {len(args.semester)} semesters in {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
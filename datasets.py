@@ -0,0 +1,175 @@
+# datasets.py
+# Process-wide registry of loaded cohort datasets, shared by every session.
+# Profile, Chatbot and Analytics objects (ProfileIndex, CohortInsights,
+# GPA/module indexes, CohortAnalytics) are keyed by the content hash of the
+# uploaded CSVs, or by cohort ID plus publish time for published cohorts, so
+# 2,000 sessions opening the same files share one copy. Entries are treated as
+# read-only. The registry is an LRU bounded by the estimated bytes of its
+# entries and keeps hit/miss/eviction counters for the performance panel.
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import current, stage
+
+DATASET_CACHE_BYTES = int(os.environ.get("RESULTPY_DATASET_CACHE_BYTES", 512 * 1024 ** 2))
+# Items measured per large container when estimating entry sizes
+ESTIMATE_SAMPLE = 512
+
+
+def upload_digest(upload):
+    """SHA-256 of an uploaded file, hashed from the uploader's buffer without copying it."""
+    buffer = upload.getbuffer()
+    try:
+        return hashlib.sha256(buffer).hexdigest()
+    finally:
+        buffer.release()
+
+
+def read_csv_upload(upload):
+    return pd.read_csv(io.BytesIO(upload.getbuffer()))
+
+
+def estimate_bytes(value, _seen=None):
+    """Deep size estimate of a dataset object: frames, arrays, containers and attributes.
+
+    Large object arrays and containers are sized from an evenly spaced sample
+    of ESTIMATE_SAMPLE items, so estimating stays cheaper than building.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype != object:
+            return value.nbytes
+        return value.nbytes + _items_bytes(value.ravel().tolist(), seen)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + _items_bytes(list(value.items()), seen)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + _items_bytes(list(value), seen)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return size + estimate_bytes(vars(value), seen)
+    return size
+
+
+def _items_bytes(items, seen):
+    step = max(len(items) // ESTIMATE_SAMPLE, 1)
+    sample = items[::step]
+    total = sum(estimate_bytes(item, seen) for item in sample)
+    return total * len(items) // max(len(sample), 1)
+
+
+class DatasetRegistry:
+    """Thread-safe LRU of read-only datasets with a total byte limit.
+
+    Concurrent requests for a key that is still being built wait for that one
+    build. The most recently added entry is never evicted, even when it alone
+    exceeds the limit.
+    """
+
+    def __init__(self, max_bytes=DATASET_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.build_seconds = 0.0
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._building = {}  # key -> Future of an in-progress build
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """The dataset for key, calling build() once on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            pending = self._building.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._building[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            started = time.perf_counter()
+            with stage("dataset_build", dataset=key[0]) as record:
+                value = build()
+                size = estimate_bytes(value)
+                record["bytes"] = size
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self.build_seconds += time.perf_counter() - started
+            del self._building[key]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            evicted = self._evict(keep=key)
+        pending.set_result(value)
+
+        recorder = current()
+        if recorder is not None:
+            for evicted_key, evicted_size in evicted:
+                recorder.record("dataset_evict", 0.0, dataset=evicted_key[0], bytes=evicted_size)
+        return value
+
+    def _evict(self, keep):
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            _, size = self._entries.pop(key)
+            self._bytes -= size
+            self.evictions += 1
+            self.evicted_bytes += size
+            evicted.append((key, size))
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "build_seconds": round(self.build_seconds, 3),
+            }
+
+
+# One registry per server process, shared by all sessions
+DATASETS = DatasetRegistry()
@@ -0,0 +1,344 @@
+# extraction.py
+# Shared helpers for turning extracted PDF matches into result tables.
+# Kept free of Streamlit so it can be reused outside the UI.
+import os
+import re
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from grades import UNGRADED, from_codes, grade_codes
+from index_numbers import normalize_index_numbers
+from instrumentation import current, stage
+from layout_extraction import parse_matches_layout
+from parse_cache import PARSE_CACHE, cache_key
+from sharded_extraction import POOL_CONTEXT, SHARD_MIN_PAGES, SeamMismatch, parse_matches_sharded
+from uploads import open_pdf
+
+# Pattern used by View Grades (IndexNumber <space> Grade)
+VIEW_GRADES_PATTERN = r"([A-Za-z0-9]+)\s+(A\+|A-|A|B\+|B-|B|C\+|C-|C|D|I)"
+# Pattern used by the GPA Calculator (IndexNumber | Grade, handles | and spaces)
+MODULE_RESULTS_PATTERN = r"([0-9A-Za-z]+)\s*\|?\s*(A\+|A-|A|B\+|B-|B|C\+|C-|C|D|I)"
+
+# Extraction engines: "regex" scans flattened text, "layout" reads table columns
+# by word coordinates and falls back to the regex when no header row is found
+ENGINES = ("regex", "layout")
+
+# Worker processes for multi-PDF and page-sharded extraction; 0 or 1 parses serially
+EXTRACT_WORKERS = int(os.environ.get("RESULTPY_EXTRACT_WORKERS", os.cpu_count() or 1))
+
+# Characters that can never be part of an IndexNumber/Grade match
+_BARRIER = re.compile(r"[^0-9A-Za-z\s|+\-]")
+# Separators the patterns allow between an IndexNumber and its grade
+_SEPARATORS = frozenset(" \t\n\r\f\v|")
+# Rows materialised at a time when a stage consumes a match iterator
+RECORD_CHUNK = 50_000
+
+# -----------------------------
+# PDF parsing
+# `pdf_bytes` below is either raw PDF bytes or an uploads.SpooledPDF, which is
+# opened by path and shipped to pool workers as a path
+def parse_matches(pdf_bytes, pattern, workers=1, progress=None):
+    """Return every (IndexNumber, Grade) match in the PDF text.
+
+    Books of SHARD_MIN_PAGES or more are split into page ranges across
+    `workers` processes; the matches are identical to a serial scan.
+    `progress(fraction, text)` is called per page (per page range when sharded).
+    """
+    with open_pdf(pdf_bytes) as doc:
+        page_count = doc.page_count
+    if workers > 1 and page_count >= SHARD_MIN_PAGES:
+        try:
+            return parse_matches_sharded(pdf_bytes, pattern, workers, page_count, progress)
+        except (SeamMismatch, BrokenProcessPool, OSError):
+            pass
+    return [(index, grade) for index, grade, _ in iter_matches(pdf_bytes, pattern, progress)]
+
+@lru_cache(maxsize=None)
+def compiled(pattern):
+    return re.compile(pattern)
+
+def _open_tail(text):
+    """Where the text that more pages could still change the matches of begins.
+
+    A match is an alphanumeric run, separators and a grade of at most two
+    characters. Matches starting before the last run that reaches (nearly) the
+    end of the text are therefore final, whatever text follows.
+    """
+    i = max(len(text) - 2, 0)
+    while i and (text[i - 1].isspace() or text[i - 1] in _SEPARATORS):
+        i -= 1
+    while i and text[i - 1].isascii() and text[i - 1].isalnum():
+        i -= 1
+    return i
+
+def iter_matches(pdf_bytes, pattern, progress=None):
+    """Yield (IndexNumber, Grade, page_no) one page at a time.
+
+    Only the current page plus the unmatched tail of the previous one is held
+    in memory. A match is emitted once no later text can change it, so tokens
+    split across a page boundary are matched exactly as in a whole-document scan. Page
+    numbers are 1-based and refer to the page the match starts on.
+    `progress(fraction, text)` is called before each page is read.
+    """
+    regex = compiled(pattern)
+    carry = ""
+    page_starts, page_numbers = [], []  # where each page begins inside `carry`
+    # Per-stage time is accumulated across the page loop and reported at the end
+    clock = time.perf_counter
+    open_s = text_s = regex_s = 0.0
+    pages = chars = matched = 0
+
+    started = clock()
+    with open_pdf(pdf_bytes) as doc:
+        open_s = clock() - started
+        for page_no, page in enumerate(doc, start=1):
+            page_starts.append(len(carry))
+            page_numbers.append(page_no)
+            pages = page_no
+            if progress is not None:
+                progress((page_no - 1) / doc.page_count, f"Page {page_no} of {doc.page_count}")
+            started = clock()
+            page_text = page.get_text("text")
+            text_s += clock() - started
+            chars += len(page_text)
+            text = carry + page_text
+
+            resume = 0
+            open_from = _open_tail(text)
+            started = clock()
+            for m in regex.finditer(text):
+                if m.start() >= open_from:
+                    break  # the next page could still extend or re-split this match
+                regex_s += clock() - started
+                matched += 1
+                yield m.group(1), m.group(2), page_numbers[bisect_right(page_starts, m.start()) - 1]
+                started = clock()
+                resume = m.end()
+            regex_s += clock() - started
+
+            # Nothing before the last barrier character can join a later match
+            barrier = None
+            for barrier in _BARRIER.finditer(text, resume, open_from):
+                pass
+            if barrier is not None:
+                resume = barrier.end()
+
+            carry = text[resume:]
+            keep = max(bisect_right(page_starts, resume) - 1, 0)
+            page_starts = [start - resume if start > resume else 0 for start in page_starts[keep:]]
+            page_numbers = page_numbers[keep:]
+
+    started = clock()
+    tail = [(m.group(1), m.group(2), page_numbers[bisect_right(page_starts, m.start()) - 1])
+            for m in regex.finditer(carry)]
+    regex_s += clock() - started
+    matched += len(tail)
+
+    recorder = current()
+    if recorder is not None:
+        recorder.record("open", open_s, pages=pages, bytes=len(pdf_bytes))
+        recorder.record("get_text", text_s, pages=pages, chars=chars)
+        recorder.record("regex", regex_s, matches=matched)
+    yield from tail
+
+def parse_with_engine(pdf_bytes, pattern, engine="regex", workers=1, progress=None):
+    """Parse with the chosen engine; "layout" falls back to the regex scan."""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if engine == "layout":
+        matches = parse_matches_layout(pdf_bytes, progress)
+        if matches is not None:
+            return matches
+    return parse_matches(pdf_bytes, pattern, workers, progress)
+
+def engine_pattern(pattern, engine):
+    # Cache key component: the same PDF parsed by another engine is a separate entry
+    return pattern if engine == "regex" else f"{engine}:{pattern}"
+
+def extract_matches(pdf_bytes, pattern, workers=None, cache=PARSE_CACHE, engine="regex", progress=None):
+    """Like parse_with_engine, but an unchanged PDF is only parsed once per server."""
+    workers = EXTRACT_WORKERS if workers is None else workers
+    parsed = []
+
+    def parse(pdf_bytes, _):
+        parsed.append(True)
+        return parse_with_engine(pdf_bytes, pattern, engine, workers, progress)
+
+    with stage("parse", bytes=len(pdf_bytes), engine=engine) as record:
+        matches = cache.get_or_parse(pdf_bytes, engine_pattern(pattern, engine), parse)
+        record.update(matches=len(matches), cached=not parsed)
+    return matches
+
+def extract_modules(pdf_blobs, pattern, workers=None, cache=PARSE_CACHE, engines=None, progress=None):
+    """Parse several module PDFs at once; match lists come back in input order.
+
+    Cached PDFs are served from the parse cache, the rest are spread over a
+    process pool. Falls back to serial parsing for a single PDF, workers <= 1,
+    or if the pool cannot be started; a single large PDF is page-sharded instead.
+    `engines` optionally picks the extraction engine per PDF.
+    `progress(fraction, text)` is called per module, and per page when parsing serially.
+    """
+    workers = EXTRACT_WORKERS if workers is None else workers
+    engines = list(engines) if engines is not None else ["regex"] * len(pdf_blobs)
+    with stage("parse_modules", pdfs=len(pdf_blobs)) as record:
+        keys = [cache_key(pdf_bytes, engine_pattern(pattern, engine))
+                for pdf_bytes, engine in zip(pdf_blobs, engines)]
+        results = [cache.get(key) for key in keys]
+        pending = [i for i, matches in enumerate(results) if matches is None]
+
+        # Stages parsed in pool workers are not recorded; only the total is
+        parsed = None
+        if workers > 1 and len(pending) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=POOL_CONTEXT) as pool:
+                    parsed = []
+                    for matches in pool.map(
+                        parse_with_engine,
+                        [pdf_blobs[i] for i in pending],
+                        [pattern] * len(pending),
+                        [engines[i] for i in pending],
+                    ):
+                        parsed.append(matches)
+                        if progress is not None:
+                            progress(len(parsed) / len(pending), f"Module {len(parsed)} of {len(pending)} parsed")
+                record["pool_workers"] = min(workers, len(pending))
+            except (BrokenProcessPool, OSError):
+                parsed = None
+        if parsed is None:
+            parsed = [
+                parse_with_engine(pdf_blobs[i], pattern, engines[i], workers,
+                                  _module_progress(progress, done, len(pending)))
+                for done, i in enumerate(pending)
+            ]
+
+        for i, matches in zip(pending, parsed):
+            results[i] = [tuple(m) for m in matches]
+            cache.put(keys[i], results[i])
+        record.update(
+            bytes=sum(len(pdf_bytes) for pdf_bytes in pdf_blobs),
+            cached=len(pdf_blobs) - len(pending),
+            matches=sum(len(matches) for matches in results),
+        )
+    return [list(matches) for matches in results]
+
+def _module_progress(progress, done, total):
+    # Page progress within module `done` as a share of the whole multi-module job
+    if progress is None:
+        return None
+    return lambda fraction, text: progress((done + fraction) / total, f"Module {done + 1} of {total}: {text}")
+
+# -----------------------------
+# Match records -> DataFrames
+def records_frame(records, columns):
+    """DataFrame from a list or iterator of (IndexNumber, Grade[, page_no]) records.
+
+    Iterators are consumed in chunks, so a streamed book never exists as one
+    big list of Python tuples. Extra fields beyond `columns` are dropped.
+    """
+    width = len(columns)
+    if isinstance(records, (list, tuple)):
+        return pd.DataFrame([tuple(r)[:width] for r in records], columns=columns)
+
+    records = iter(records)
+    chunks = []
+    while True:
+        chunk = [tuple(r)[:width] for r in islice(records, RECORD_CHUNK)]
+        if not chunk:
+            break
+        chunks.append(pd.DataFrame(chunk, columns=columns))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+# -----------------------------
+# Name lookup built once per index.csv upload
+def build_name_index(index_df):
+    """Hash index IndexNumber -> Name; the first row wins for duplicate numbers."""
+    keys = normalize_index_numbers(index_df["IndexNumber"])
+    name_index = pd.Series(index_df["Name"].values, index=keys.values)
+    name_index = name_index[name_index.index.notna()]
+    return name_index[~name_index.index.duplicated(keep="first")]
+
+def join_names(matches, name_index):
+    """Join (IndexNumber, Grade) matches to names and sort by grade in one pass.
+
+    `matches` may be a list or a streaming iterator such as iter_matches().
+    """
+    with stage("join") as record:
+        results_df = records_frame(matches, ["IndexNumber", "Result"])
+        record["matches"] = len(results_df)
+        results_df["Name"] = results_df["IndexNumber"].map(name_index)
+        results_df = results_df.dropna(subset=["Name"])
+
+        # Grade codes run best first, so a stable sort on them is the grade order
+        codes = grade_codes(results_df["Result"])
+        order = codes.argsort(kind="stable")
+        results_df = pd.DataFrame({
+            "Name": results_df["Name"].to_numpy()[order],
+            "Result": from_codes(codes[order]),
+        })
+        record["rows"] = len(results_df)
+    return results_df
+
+# -----------------------------
+# Wide results table for the GPA Calculator
+DUPLICATE_RULES = ("last", "first", "best")
+
+def combine_results(index_df, module_results, duplicates="last"):
+    """Build the wide results table in one pass.
+
+    `module_results` is a list of (module_name, matches), where matches may
+    be a list or a streaming iterator such as iter_matches(). All matches are
+    stacked in long (IndexNumber, Module, Grade) form, de-duplicated per
+    (IndexNumber, Module) with the chosen rule ("last", "first" or "best"
+    attempt) and pivoted once against index_df.
+
+    Returns (all_results, duplicates_df); duplicates_df lists every
+    IndexNumber/Module pair that appeared more than once.
+    """
+    if duplicates not in DUPLICATE_RULES:
+        raise ValueError(f"duplicates must be one of {DUPLICATE_RULES}")
+
+    with stage("combine") as record:
+        modules = list(dict.fromkeys(module_name for module_name, _ in module_results))
+        long_df = pd.concat(
+            [records_frame(matches, ["IndexNumber", "Grade"]).assign(Module=module_name)
+             for module_name, matches in module_results],
+            ignore_index=True,
+        ) if module_results else pd.DataFrame(columns=["IndexNumber", "Grade", "Module"])
+        record.update(modules=len(modules), matches=len(long_df), students=len(index_df))
+
+        keys = ["IndexNumber", "Module"]
+        repeated = long_df[long_df.duplicated(keys, keep=False)]
+        duplicates_df = (
+            repeated.groupby(keys, sort=False)["Grade"]
+            .agg(Occurrences="size", Grades=", ".join)
+            .reset_index()
+        )
+
+        if duplicates == "best":
+            order = grade_codes(long_df["Grade"]).argsort(kind="stable")
+            long_df = long_df.iloc[order]
+            long_df = long_df.drop_duplicates(keys, keep="first")
+        else:
+            long_df = long_df.drop_duplicates(keys, keep=duplicates)
+
+        # Scatter the grade codes into a students x modules int8 grid; the extra
+        # last row is all ungraded and serves index.csv rows with no results
+        students, student_keys = pd.factorize(long_df["IndexNumber"])
+        grid = np.full((len(student_keys) + 1, len(modules)), UNGRADED, dtype=np.int8)
+        grid[students, pd.Index(modules).get_indexer(long_df["Module"])] = grade_codes(long_df["Grade"])
+        rows = grid[pd.Index(student_keys).get_indexer(normalize_index_numbers(index_df["IndexNumber"]))]
+
+        all_results = pd.concat([index_df, pd.DataFrame(
+            {module: from_codes(rows[:, i]) for i, module in enumerate(modules)}, index=index_df.index,
+        )], axis=1)
+        record["duplicates"] = len(duplicates_df)
+    return all_results, duplicates_df
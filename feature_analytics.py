@@ -0,0 +1,68 @@
+# feature_analytics.py
+# Homepage feature: Cohort Analytics. Imported by homepage.main() only when
+# selected; does not load PyMuPDF.
+import streamlit as st
+
+from choices import COMBINED_SOURCES, SORT_CHOICES
+from cohort_analytics import PASS_GRADE
+from datasets import read_csv_upload, upload_digest
+from page_data import load_analytics
+from results_store import ResultsStore
+
+# ===============================
+# FEATURE 5: Cohort Analytics
+# ===============================
+def cohort_analytics():
+    st.title("📈 Cohort Analytics")
+
+    source = st.radio("Results source", COMBINED_SOURCES, horizontal=True, key="ca_source")
+
+    if source == "Published cohort":
+        store = ResultsStore()
+        cohorts = store.list_cohorts()
+        if not cohorts:
+            st.info("No published cohorts yet. Publish one from the GPA Calculator.")
+            st.stop()
+        cohort_id = st.selectbox("Cohort", cohorts, key="ca_cohort")
+        analytics = load_analytics(("store", cohort_id, store.published_at(cohort_id)),
+                                   lambda: store.cohort(cohort_id)[0])
+    else:
+        combined_file = st.file_uploader("Upload Combined Results CSV", type="csv", key="ca_combined")
+        if not combined_file:
+            st.stop()
+        analytics = load_analytics(("csv", upload_digest(combined_file)),
+                                   lambda: read_csv_upload(combined_file))
+
+    if not analytics.modules:
+        st.warning("⚠️ No module columns found in the results.")
+        st.stop()
+
+    # Filters only slice the cached tables
+    modules = st.multiselect("Modules", analytics.modules, default=analytics.modules, key="ca_modules")
+    min_graded = st.number_input("Minimum graded students", min_value=0, value=0, step=1, key="ca_min_graded")
+    sort_by = st.selectbox("Sort modules by", list(SORT_CHOICES), key="ca_sort")
+
+    stats = analytics.module_stats.loc[modules]
+    stats = stats[stats["Graded"] >= min_graded]
+    column, ascending = SORT_CHOICES[sort_by]
+    stats = stats.sort_values(column, ascending=ascending, kind="stable")
+    modules = stats.index.tolist()
+    if not modules:
+        st.info("No modules match the filters.")
+        st.stop()
+
+    st.subheader("📋 Module Summary")
+    st.caption(f"{analytics.students} students; pass means {PASS_GRADE} or better. "
+               "Difficulty 1 is the module with the lowest mean grade point.")
+    st.dataframe(stats.round(2), use_container_width=True)
+
+    st.subheader("📊 Grade Distribution (% of graded students)")
+    distribution = analytics.distribution_percent().loc[modules]
+    st.bar_chart(distribution)
+    st.dataframe(distribution.round(1), use_container_width=True)
+
+    st.subheader("🔗 Module Correlations")
+    st.caption("Pearson correlation of grade points over students graded in both modules.")
+    st.dataframe(analytics.correlated_pairs(modules).round(3), use_container_width=True)
+    with st.expander("Full correlation matrix"):
+        st.dataframe(analytics.correlation.loc[modules, modules].round(2), use_container_width=True)
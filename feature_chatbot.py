@@ -0,0 +1,82 @@
+# feature_chatbot.py
+# Homepage feature: Grade Insights Chatbot. Imported by homepage.main() only when
+# selected; does not load PyMuPDF.
+import streamlit as st
+
+from choices import RESULT_SOURCES
+from insights import reply, student_insight
+from page_data import load_cohort_gpa_index, load_cohort_module_index, load_insights
+from results_store import ResultsStore
+
+# ===============================
+# FEATURE 4: Chatbot
+# ===============================
+def chatbot():
+    st.title("🤖 Grade Insights Chatbot")
+
+    source = st.radio("Results source", RESULT_SOURCES, horizontal=True, key="cb_source")
+
+    if source == "Published cohort":
+        store = ResultsStore()
+        cohorts = store.list_cohorts()
+        if not cohorts:
+            st.info("No published cohorts yet. Publish one from the GPA Calculator.")
+            st.stop()
+        cohort_id = st.selectbox("Cohort", cohorts, key="cb_cohort")
+
+        index_number = st.text_input("Enter your Index Number:", key="cb_index")
+        if not index_number:
+            st.stop()
+
+        student = store.student(cohort_id, index_number)
+        if student is None:
+            st.error("Index Number not found!")
+            st.stop()
+        student_row, gpa_row = student
+        insight = student_insight(student_row, store.modules(cohort_id), gpa_row["GPA"], gpa_row["Rank"])
+        top = store.top(cohort_id, 1)
+        top_student = top.iloc[0] if len(top) else None
+        published_at = store.published_at(cohort_id)
+        gpa_index = load_cohort_gpa_index(cohort_id, published_at)
+        module_index = load_cohort_module_index(cohort_id, published_at)
+    else:
+        combined_file = st.file_uploader("Upload Combined Results CSV", type="csv", key="cb_combined")
+        gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv", key="cb_gpa")
+
+        if not combined_file or not gpa_file:
+            st.info("Upload both combined results and GPA CSV files to start the chatbot.")
+            st.stop()
+
+        # Insight table for the whole cohort, built once per pair of uploads and shared across sessions
+        insights = load_insights(combined_file, gpa_file)
+
+        index_number = st.text_input("Enter your Index Number:", key="cb_index")
+        if not index_number:
+            st.stop()
+
+        insight = insights.student(index_number)
+        if insight is None:
+            st.error("Index Number not found!")
+            st.stop()
+        top_student = insights.top_student
+        gpa_index = insights.gpa_index
+        module_index = insights.module_index
+
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = []
+
+    st.caption("Try: 'my weak modules', 'top 5', 'my percentile', 'top 3 in <module>', "
+               "'how many A+ in <module>', 'my rank in <module>', 'average of <module>'")
+    user_input = st.text_input("Ask a question:", key="cb_user_input")
+    send_button = st.button("Send", key="cb_send")
+
+    if send_button and user_input.strip() != "":
+        response = reply(user_input, insight, top_student, gpa_index, module_index)
+        st.session_state.chat_history.append(("You", user_input))
+        st.session_state.chat_history.append(("Bot", response))
+
+    for sender, message in st.session_state.chat_history:
+        if sender == "You":
+            st.markdown(f"<p style='text-align: right; color: blue;'>💬 {message}</p>", unsafe_allow_html=True)
+        else:
+            st.markdown(f"<p style='text-align: left; color: green;'>🤖 {message}</p>", unsafe_allow_html=True)
@@ -0,0 +1,126 @@
+# feature_gpa_calculator.py
+# Homepage feature: GPA Calculator. Imported by homepage.main() only when selected.
+import streamlit as st
+import pandas as pd
+
+from choices import DUPLICATE_CHOICES, ENGINE_CHOICES
+from datasets import upload_digest
+from extraction import MODULE_RESULTS_PATTERN, extract_modules
+from incremental import IncrementalCohort
+from jobs import JOBS, wait
+from results_store import ResultsStore
+from uploads import spool_upload
+
+# ===============================
+# FEATURE 2: GPA Calculator
+# ===============================
+
+def gpa_calculator():
+    def extract_results(matches, module_name):
+        if not matches:
+            st.warning(f"No results found in {module_name}")
+            return pd.DataFrame(columns=["IndexNumber", module_name])
+
+        return pd.DataFrame(matches, columns=["IndexNumber", module_name])
+
+    st.title("📊 GPA Calculator")
+
+    index_file = st.file_uploader("Upload index.csv", type="csv", key="gpa_index")
+    if not index_file:
+        st.stop()
+
+    index_df = pd.read_csv(index_file)
+    index_df.columns = index_df.columns.str.strip()
+
+    if "IndexNumber" not in index_df.columns or "Name" not in index_df.columns:
+        st.error("❌ index.csv must have 'IndexNumber' and 'Name'")
+        st.stop()
+
+    st.subheader("✅ Index File Preview")
+    st.dataframe(index_df.head())
+
+    num_modules = st.number_input("Enter number of modules", min_value=1, max_value=20, step=1)
+
+    module_info = []
+    for i in range(num_modules):
+        st.subheader(f"📘 Module {i+1}")
+        module_name = st.text_input(f"Module {i+1} Name", key=f"gpa_name_{i}")
+        credit = st.number_input(
+            f"Credit for {module_name if module_name else f'Module {i+1}'}",
+            min_value=0.5, max_value=10.0, step=0.5, key=f"gpa_credit_{i}"
+        )
+        pdf_file = st.file_uploader(
+            f"Results PDF for {module_name if module_name else f'Module {i+1}'}",
+            type="pdf", key=f"gpa_pdf_{i}"
+        )
+        engine = st.radio(
+            "Read results by", list(ENGINE_CHOICES), horizontal=True, key=f"gpa_engine_{i}"
+        )
+        if module_name and credit and pdf_file:
+            module_info.append((module_name, credit, pdf_file, ENGINE_CHOICES[engine]))
+
+    duplicate_rule = st.selectbox(
+        "If an index number appears more than once in a PDF, keep",
+        list(DUPLICATE_CHOICES), key="gpa_duplicates"
+    )
+
+    if len(module_info) == num_modules:
+        # Keep one incremental cohort per index.csv and duplicate rule across reruns,
+        # so adding or replacing a module PDF only re-parses that module
+        cohort_key = (upload_digest(index_file), DUPLICATE_CHOICES[duplicate_rule])
+        if st.session_state.get("gpa_cohort_key") != cohort_key:
+            st.session_state.gpa_cohort_key = cohort_key
+            st.session_state.gpa_incremental = IncrementalCohort(index_df, cohort_key[1])
+        cohort = st.session_state.gpa_incremental
+        # Module PDFs are spooled to disk once per upload and parsed by path
+        modules = [(name, credit, spool_upload(pdf_file), engine) for name, credit, pdf_file, engine in module_info]
+
+        # Parse new or replaced module PDFs in a background job; a rerun mid-parse
+        # waits on the same job instead of starting again. The cohort takes the
+        # job's matches, so the finished job is not kept in JOBS
+        stale = cohort.stale(modules)
+        parsed = None
+        if stale:
+            job_key = ("gpa_modules", tuple((pdf.digest, engine) for _, _, pdf, engine in stale))
+            job = JOBS.submit(
+                job_key, extract_modules, [pdf for _, _, pdf, _ in stale], MODULE_RESULTS_PATTERN,
+                engines=[engine for *_, engine in stale],
+            )
+            parsed = wait(job, st.progress(0.0, text="⏳ Processing module PDFs..."))
+            JOBS.discard(job_key)
+        cohort.sync(modules, MODULE_RESULTS_PATTERN, parsed=parsed)
+
+        module_names = list(dict.fromkeys(name for name, *_ in module_info))
+        for module_name in module_names:
+            results_df = extract_results(cohort.matches(module_name), module_name)
+            st.write(f"📑 Extracted Results for {module_name}:")
+            st.dataframe(results_df)
+
+        all_results = cohort.all_results(module_names)
+        duplicates_df = cohort.duplicates(module_names)
+        if not duplicates_df.empty:
+            st.warning(f"⚠️ {len(duplicates_df)} index numbers appear more than once in a module PDF")
+            st.dataframe(duplicates_df)
+
+        st.subheader("📑 Combined Results Table")
+        st.dataframe(all_results)
+
+        cohort_id = st.text_input(
+            "Cohort ID (optional, publishes results to the Profile and Chatbot pages)", key="gpa_cohort"
+        ).strip()
+
+        if st.button("Calculate GPA"):
+            gpa_df = cohort.leaderboard()
+            st.subheader("🏆 GPA Leaderboard")
+            st.dataframe(gpa_df)
+
+            if cohort_id:
+                ResultsStore().publish(cohort_id, all_results, gpa_df, cohort.module_credits)
+                st.success(f"✅ Published cohort '{cohort_id}'")
+
+            st.download_button(
+                label="⬇️ Download GPA Results (CSV)",
+                data=gpa_df.to_csv(index=False).encode("utf-8"),
+                file_name="gpa_results.csv",
+                mime="text/csv"
+            )
@@ -0,0 +1,119 @@
+# feature_profile.py
+# Homepage feature: Personalized Profile. Imported by homepage.main() only when
+# selected; does not load PyMuPDF.
+import streamlit as st
+import pandas as pd
+
+from choices import RESULT_SOURCES
+from datasets import upload_digest
+from page_data import bulk_reports, load_cohort_gpa_index, load_profile_index
+from profile_index import ProfileIndex
+from results_store import ResultsStore
+
+# ===============================
+# FEATURE 3: Personalized Profile
+# ===============================
+def personalized_profile():
+    st.title("👤 Personalized Academic Profile")
+
+    source = st.radio("Results source", RESULT_SOURCES, horizontal=True, key="pp_source")
+
+    if source == "Published cohort":
+        store = ResultsStore()
+        cohorts = store.list_cohorts()
+        if not cohorts:
+            st.info("No published cohorts yet. Publish one from the GPA Calculator.")
+            st.stop()
+        cohort_id = st.selectbox("Cohort", cohorts, key="pp_cohort")
+        bulk_reports(("store", cohort_id, store.published_at(cohort_id)),
+                     lambda: ProfileIndex(*store.cohort(cohort_id)), key_prefix="pp_")
+
+        index_number = st.text_input("Enter your Index Number:", key="pp_index")
+        if not index_number:
+            return
+
+        # Indexed single-student read instead of loading both tables
+        student = store.student(cohort_id, index_number)
+        if student is None:
+            st.error("❌ Index Number not found!")
+            return
+        student_row, gpa_row = student
+        rank = gpa_row["Rank"]
+        total_students = store.count(cohort_id)
+        grade_cols = store.modules(cohort_id)
+        gpa_index = load_cohort_gpa_index(cohort_id, store.published_at(cohort_id))
+    else:
+        combined_file = st.file_uploader("Upload Combined Results CSV", type="csv", key="pp_combined")
+        gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv", key="pp_gpa")
+
+        if not combined_file or not gpa_file:
+            st.stop()
+
+        # Lookup and rank index, built once per pair of uploads and shared across sessions
+        digests = (upload_digest(combined_file), upload_digest(gpa_file))
+        profile_index = load_profile_index(digests, combined_file, gpa_file)
+        combined_df, gpa_df = profile_index.combined_df, profile_index.gpa_df
+        bulk_reports(("csv",) + digests,
+                     lambda: profile_index, key_prefix="pp_")
+
+        st.subheader("✅ Uploaded Data Previews")
+        st.write("Combined Results:")
+        st.dataframe(combined_df.head())
+        st.write("GPA Results:")
+        st.dataframe(gpa_df.head())
+
+        index_number = st.text_input("Enter your Index Number:", key="pp_index")
+        if not index_number:
+            return
+
+        student = profile_index.lookup(index_number)
+        if student is None or student[1] is None:
+            st.error("❌ Index Number not found!")
+            return
+
+        student_row, gpa_row = student
+        rank = gpa_row["Rank"]
+        total_students = profile_index.total_students
+        grade_cols = profile_index.grade_cols
+        gpa_index = profile_index.gpa_index
+
+    st.markdown('<div class="profile-card" style="display:flex;gap:20px;margin:20px 0;">', unsafe_allow_html=True)
+
+    st.markdown(f"""
+        <div class="card" style="flex:1;background:#fff;padding:20px;border-radius:15px;box-shadow:0 4px 12px rgba(0,0,0,0.1);">
+            <h3>👤 Name</h3>
+            <p>{student_row['Name']}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown(f"""
+        <div class="card" style="flex:1;background:#fff;padding:20px;border-radius:15px;box-shadow:0 4px 12px rgba(0,0,0,0.1);">
+            <h3>📊 GPA</h3>
+            <p>{gpa_row['GPA']}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown(f"""
+        <div class="card" style="flex:1;background:#fff;padding:20px;border-radius:15px;box-shadow:0 4px 12px rgba(0,0,0,0.1);">
+            <h3>🏆 Rank</h3>
+            <p>{rank} / {total_students}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Percentile from the sorted GPA index (binary search, not a cohort scan)
+    percentile = f"{gpa_index.percentile(gpa_row['GPA']):.1f}" if pd.notna(gpa_row["GPA"]) else "-"
+    st.markdown(f"""
+        <div class="card" style="flex:1;background:#fff;padding:20px;border-radius:15px;box-shadow:0 4px 12px rgba(0,0,0,0.1);">
+            <h3>📈 Percentile</h3>
+            <p>{percentile}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    st.write("### 📘 Module Grades")
+    grades_table = pd.DataFrame({
+        "Module": grade_cols,
+        "Grade": [student_row[col] for col in grade_cols]
+    })
+    st.dataframe(grades_table, use_container_width=True)
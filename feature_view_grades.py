@@ -0,0 +1,46 @@
+# feature_view_grades.py
+# Homepage feature: View Grades. Imported by homepage.main() only when selected.
+import streamlit as st
+import pandas as pd
+
+from choices import ENGINE_CHOICES
+from extraction import VIEW_GRADES_PATTERN, build_name_index, extract_matches, join_names
+from jobs import JOBS, wait
+from uploads import spool_upload
+
+# ===============================
+# FEATURE 1: View Grades
+# ===============================
+def view_grades():
+    def extract_results(pdf_file, name_index, engine):
+        # Spooled to disk once and parsed by path in a background job; a rerun
+        # mid-parse waits on the same job
+        pdf = spool_upload(pdf_file)
+        job = JOBS.submit(("view_grades", pdf.digest, engine),
+                          extract_matches, pdf, VIEW_GRADES_PATTERN, engine=engine)
+        matches = wait(job, st.progress(0.0, text="⏳ Processing results..."))
+
+        if not matches:
+            st.error("⚠️ No results found in the PDF.")
+            return pd.DataFrame()
+
+        results_df = join_names(matches, name_index)
+        if results_df.empty:
+            st.warning("⚠️ No valid results matched with index.csv")
+        return results_df
+
+    st.title("📄 View Grades")
+    index_file = st.file_uploader("Upload index.csv", type="csv", key="vg_index")
+    if index_file is not None:
+        index_df = pd.read_csv(index_file)
+        st.write("✅ Index File Preview")
+        st.dataframe(index_df)
+        name_index = build_name_index(index_df)
+
+        pdf_file = st.file_uploader("Upload Results PDF", type="pdf", key="vg_pdf")
+        engine = st.radio("Read results by", list(ENGINE_CHOICES), horizontal=True, key="vg_engine")
+        if pdf_file is not None:
+            results_df = extract_results(pdf_file, name_index, ENGINE_CHOICES[engine])
+            if not results_df.empty:
+                st.subheader("📑 Sorted Results")
+                st.dataframe(results_df)
@@ -0,0 +1,97 @@
+# gpa_engine.py
+# Vectorized GPA calculation over a whole cohort.
+# Grades are mapped to points through a lookup array and weighted with a
+# credit vector, so the cost is a few NumPy matrix operations instead of a
+# Python loop per student per module.
+#
+# Totals are kept in exact integer units (tenths of a grade point times
+# thousandths of a credit), so they can be updated by adding and subtracting
+# per-module deltas without floating-point drift.
+import numpy as np
+import pandas as pd
+
+from grades import GRADES, code_lookup, grade_codes as column_codes
+from instrumentation import stage
+
+# Grade to grade-point mapping
+GRADE_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D": 1.0, "I": 0.0
+}
+
+POINT_SCALE = 10      # grade points have one decimal place
+CREDIT_SCALE = 1000   # credits are exact to 0.001
+# Grade points in integer units, indexed by grade code (-1, ungraded, maps to 0)
+POINT_UNITS = code_lookup((round(GRADE_POINTS[g] * POINT_SCALE) for g in GRADES), 0).astype(np.int64)
+# Same lookup in grade points, NaN for ungraded cells
+POINTS_LOOKUP = code_lookup((GRADE_POINTS[g] for g in GRADES), np.nan).astype(float)
+
+
+def credit_units(credit):
+    return int(round(float(credit) * CREDIT_SCALE))
+
+
+def grade_codes(all_results, modules):
+    """Return a students x modules matrix of grade codes (-1 if ungraded)."""
+    if not modules:
+        return np.empty((len(all_results), 0), dtype=np.int8)
+    return np.column_stack([column_codes(all_results[module]) for module in modules])
+
+
+def grade_point_matrix(all_results, modules):
+    """Return a students x modules float matrix of grade points (NaN if ungraded)."""
+    return POINTS_LOOKUP[grade_codes(all_results, modules)]
+
+
+def module_totals(grades, credit):
+    """Exact (weighted points, credits) one module adds to each student's totals.
+
+    Ungraded cells contribute neither points nor credits.
+    """
+    codes = column_codes(grades)
+    graded = (codes >= 0).astype(np.int64)
+    units = credit_units(credit)
+    return POINT_UNITS[codes] * units, graded * units
+
+
+def weighted_totals(all_results, module_credits):
+    """Return exact (weighted points, credits attempted) per student, in integer units.
+
+    Ungraded modules contribute neither points nor credits.
+    """
+    modules = [m for m in module_credits if m in all_results.columns]
+    credits = np.array([credit_units(module_credits[m]) for m in modules], dtype=np.int64)
+
+    codes = grade_codes(all_results, modules)
+    graded = (codes >= 0).astype(np.int64)
+    return POINT_UNITS[codes] @ credits, graded @ credits
+
+
+def gpa_from_totals(weighted, total_credits):
+    """GPA rounded half-up to 2 decimals from exact totals; 0 with no graded credits."""
+    weighted = np.asarray(weighted, dtype=np.int64)
+    denominator = np.asarray(total_credits, dtype=np.int64) * POINT_SCALE
+    # floor(100 * weighted / denominator + 1/2), in integers
+    cents = (200 * weighted + denominator) // np.maximum(2 * denominator, 1)
+    return np.where(denominator > 0, cents, 0) / 100
+
+
+def leaderboard(index_numbers, names, weighted, total_credits):
+    """GPA leaderboard (IndexNumber, Name, GPA) sorted by GPA, best first."""
+    with stage("leaderboard", students=len(weighted)):
+        gpa_df = pd.DataFrame({
+            "IndexNumber": np.asarray(index_numbers),
+            "Name": np.asarray(names),
+            "GPA": gpa_from_totals(weighted, total_credits),
+        })
+        return gpa_df.sort_values(by="GPA", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def compute_gpa(all_results, module_credits):
+    """GPA leaderboard (IndexNumber, Name, GPA) sorted by GPA, best first."""
+    with stage("gpa", students=len(all_results), modules=len(module_credits)):
+        weighted, total_credits = weighted_totals(all_results, module_credits)
+    return leaderboard(all_results["IndexNumber"].values, all_results["Name"].values,
+                       weighted, total_credits)
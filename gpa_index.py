@@ -0,0 +1,79 @@
+# gpa_index.py
+# Sorted GPA index for one cohort.
+# GPAs are sorted once when a leaderboard is loaded; top-k, competition rank,
+# percentile, range counts and tie groups are then binary searches over the
+# sorted array, whatever order the uploaded GPA CSV was in.
+import numpy as np
+import pandas as pd
+
+
+class GPAIndex:
+    """GPA leaderboard sorted best first; students without a GPA are left out."""
+
+    def __init__(self, index_numbers, names, gpa):
+        gpa = pd.to_numeric(pd.Series(gpa), errors="coerce").to_numpy(dtype=float)
+        graded = np.flatnonzero(~np.isnan(gpa))
+        # Best GPA first; ties keep their original row order
+        order = graded[np.lexsort((graded, -gpa[graded]))]
+        self.index_numbers = np.asarray(index_numbers, dtype=object)[order]
+        self.names = np.asarray(names, dtype=object)[order]
+        self.gpa = gpa[order]
+        self._ascending = self.gpa[::-1]
+
+    @classmethod
+    def from_frame(cls, gpa_df):
+        return cls(gpa_df["IndexNumber"].to_numpy(), gpa_df["Name"].to_numpy(), gpa_df["GPA"])
+
+    def __len__(self):
+        return len(self.gpa)
+
+    # -----------------------------
+    # Counts by binary search
+    def count_above(self, gpa, inclusive=False):
+        """Students with a GPA above (or, inclusive, at least) `gpa`."""
+        side = "left" if inclusive else "right"
+        return len(self) - int(np.searchsorted(self._ascending, gpa, side=side))
+
+    def count_below(self, gpa, inclusive=False):
+        side = "right" if inclusive else "left"
+        return int(np.searchsorted(self._ascending, gpa, side=side))
+
+    def count_between(self, low, high):
+        """Students with low <= GPA <= high."""
+        return max(self.count_below(high, inclusive=True) - self.count_below(low), 0)
+
+    def rank(self, gpa):
+        """Standard competition rank (1, 2, 2, 4) a student with this GPA holds."""
+        return self.count_above(gpa) + 1
+
+    def percentile(self, gpa):
+        """Percentile rank: share of the cohort below `gpa`, counting ties as half."""
+        if not len(self):
+            return None
+        below = self.count_below(gpa)
+        tied = self.count_below(gpa, inclusive=True) - below
+        return 100.0 * (below + tied / 2) / len(self)
+
+    # -----------------------------
+    # Rows
+    def top_rows(self, k=1):
+        """The k best students as (IndexNumber, Name, GPA, Rank) tuples."""
+        k = max(int(k), 0)
+        gpa = self.gpa[:k]
+        # rank = 1 + number of strictly better GPAs, found in the descending array
+        ranks = np.searchsorted(-self.gpa, -gpa, side="left") + 1
+        return list(zip(self.index_numbers[:k].tolist(), self.names[:k].tolist(), gpa.tolist(), ranks.tolist()))
+
+    def top(self, k=1):
+        """top_rows() as a DataFrame."""
+        return pd.DataFrame(self.top_rows(k), columns=["IndexNumber", "Name", "GPA", "Rank"])
+
+    def ties(self, gpa):
+        """Students sharing exactly this GPA, in leaderboard order."""
+        first = self.count_above(gpa)
+        last = first + self.count_between(gpa, gpa)
+        return pd.DataFrame({
+            "IndexNumber": self.index_numbers[first:last],
+            "Name": self.names[first:last],
+            "GPA": self.gpa[first:last],
+        })
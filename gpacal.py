@@ -1,31 +1,20 @@
 import streamlit as st
 import pandas as pd
-import fitz  # PyMuPDF
-import re
 
-def app():
-    # -----------------------------
-    # Grade to grade-point mapping
-    grade_points = {
-        "A+": 4.0, "A": 4.0, "A-": 3.7,
-        "B+": 3.3, "B": 3.0, "B-": 2.7,
-        "C+": 2.3, "C": 2.0, "C-": 1.7,
-        "D": 1.0, "I": 0.0
-    }
+from choices import DUPLICATE_CHOICES, ENGINE_CHOICES
+from datasets import upload_digest
+from extraction import MODULE_RESULTS_PATTERN, extract_modules
+from incremental import IncrementalCohort
+from jobs import JOBS, wait
+from perf_panel import profiled
+from results_store import ResultsStore
+from uploads import spool_upload
 
+def app():
     # -----------------------------
-    # Extract results from PDF
-    def extract_results(pdf_bytes, module_name):
-        """Extract IndexNumber and Grade from your PDF format."""
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        pdf_text = ""
-        for page in doc:
-            pdf_text += page.get_text("text")
-
-        # Regex: IndexNumber | Grade (handles | and spaces)
-        pattern = r"([0-9A-Za-z]+)\s*\|?\s*(A\+|A-|A|B\+|B-|B|C\+|C-|C|D|I)"
-        matches = re.findall(pattern, pdf_text)
-
+    # Build a module's results table from its PDF matches
+    def extract_results(matches, module_name):
+        """Turn (IndexNumber, Grade) matches into the module's results table."""
         if not matches:
             st.warning(f"No valid results found in PDF for {module_name}.")
             return pd.DataFrame(columns=["IndexNumber", module_name])
@@ -68,49 +57,71 @@ def app():
                 f"Results PDF for {module_name if module_name else f'Module {i+1}'}",
                 type="pdf", key=f"pdf_{i}"
             )
+            engine = st.radio("Read results by", list(ENGINE_CHOICES), horizontal=True, key=f"engine_{i}")
             if module_name and credit and pdf_file:
-                module_info.append((module_name, credit, pdf_file))
+                module_info.append((module_name, credit, pdf_file, ENGINE_CHOICES[engine]))
+
+        duplicate_rule = st.selectbox(
+            "If an index number appears more than once in a PDF, keep",
+            list(DUPLICATE_CHOICES)
+        )
 
         # Step 3: Process PDFs and combine results
         if len(module_info) == num_modules:
-            all_results = index_df.copy()
-            module_credits = {}
+            # One incremental cohort per index.csv and duplicate rule, kept across reruns;
+            # only modules whose PDF or engine changed are re-parsed
+            cohort_key = (upload_digest(index_file), DUPLICATE_CHOICES[duplicate_rule])
+            if st.session_state.get("cohort_key") != cohort_key:
+                st.session_state.cohort_key = cohort_key
+                st.session_state.incremental = IncrementalCohort(index_df, cohort_key[1])
+            cohort = st.session_state.incremental
+            # Module PDFs are spooled to disk once per upload and parsed by path
+            modules = [(name, credit, spool_upload(pdf_file), engine) for name, credit, pdf_file, engine in module_info]
+
+            # Parse new or replaced PDFs in a background job so a rerun mid-parse waits on it
+            # instead of restarting; the sync below takes the job's matches, so the job is not kept
+            stale = cohort.stale(modules)
+            parsed = None
+            if stale:
+                job_key = ("gpa_modules", tuple((pdf.digest, engine) for _, _, pdf, engine in stale))
+                job = JOBS.submit(
+                    job_key, extract_modules, [pdf for _, _, pdf, _ in stale], MODULE_RESULTS_PATTERN,
+                    engines=[engine for *_, engine in stale],
+                )
+                parsed = wait(job, st.progress(0.0, text="Processing module PDFs..."))
+                JOBS.discard(job_key)
+            cohort.sync(modules, MODULE_RESULTS_PATTERN, parsed=parsed)
 
-            for module_name, credit, pdf_file in module_info:
-                pdf_bytes = pdf_file.getvalue()
-                results_df = extract_results(pdf_bytes, module_name)
+            module_names = list(dict.fromkeys(name for name, *_ in module_info))
+            for module_name in module_names:
+                results_df = extract_results(cohort.matches(module_name), module_name)
 
                 st.write(f"📑 Extracted Results for {module_name}:")
                 st.dataframe(results_df)
 
-                # Merge with index_df on IndexNumber
-                all_results = all_results.merge(results_df, on="IndexNumber", how="left")
-                module_credits[module_name] = credit
+            all_results = cohort.all_results(module_names)
+            duplicates_df = cohort.duplicates(module_names)
+            if not duplicates_df.empty:
+                st.warning(f"⚠️ {len(duplicates_df)} index numbers appear more than once in a module PDF")
+                st.dataframe(duplicates_df)
 
             st.subheader("📑 Combined Results Table")
             st.dataframe(all_results)
 
             # Step 4: GPA Calculation
+            cohort_id = st.text_input(
+                "Cohort ID (optional, publishes results to the Profile and Chatbot pages)"
+            ).strip()
+
             if st.button("Calculate GPA"):
-                gpa_data = []
-                for _, row in all_results.iterrows():
-                    total_weighted, total_credits = 0, 0
-                    for module_name, credit in module_credits.items():
-                        grade = row.get(module_name, None)
-                        if grade in grade_points:
-                            total_weighted += grade_points[grade] * credit
-                            total_credits += credit
-                    gpa = total_weighted / total_credits if total_credits > 0 else 0
-                    gpa_data.append({
-                        "IndexNumber": row["IndexNumber"],
-                        "Name": row["Name"],
-                        "GPA": round(gpa, 2)
-                    })
-
-                gpa_df = pd.DataFrame(gpa_data).sort_values(by="GPA", ascending=False).reset_index(drop=True)
+                gpa_df = cohort.leaderboard()
                 st.subheader("🏆 GPA Leaderboard")
                 st.dataframe(gpa_df)
 
+                if cohort_id:
+                    ResultsStore().publish(cohort_id, all_results, gpa_df, cohort.module_credits)
+                    st.success(f"✅ Published cohort '{cohort_id}'")
+
                 st.download_button(
                     label="⬇️ Download GPA Results (CSV)",
                     data=gpa_df.to_csv(index=False).encode("utf-8"),
@@ -120,4 +131,5 @@ def app():
 
     # -----------------------------
     if __name__ == "__main__":
-        main()
+        with profiled("GPA Calculator"):
+            main()
@@ -0,0 +1,60 @@
+# grades.py
+# Shared compact grade type.
+# Grades are stored as an ordered pandas categorical whose integer codes run
+# from 0 (A+) to 10 (I), best first, with -1 for an ungraded cell. A wide
+# cohort then costs one byte per cell instead of a Python string, and sorting,
+# grade-point lookup, weak/strong filtering and distributions are plain array
+# operations on the codes.
+import numpy as np
+import pandas as pd
+
+# Best grade first; a grade's code is its position in this list
+GRADES = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D", "I"]
+GRADE_DTYPE = pd.CategoricalDtype(GRADES, ordered=True)
+GRADE_INDEX = pd.Index(GRADES)
+UNGRADED = -1
+
+WEAK_GRADES = ["D", "C-", "C", "C+"]
+STRONG_GRADES = ["A+", "A", "A-"]
+
+
+def code_lookup(values, fill):
+    """Array indexed by grade code; the extra last slot serves code -1 (ungraded)."""
+    return np.array(list(values) + [fill])
+
+
+# Boolean masks indexed by grade code
+WEAK_MASK = code_lookup((g in WEAK_GRADES for g in GRADES), False)
+STRONG_MASK = code_lookup((g in STRONG_GRADES for g in GRADES), False)
+
+
+def grade_codes(values):
+    """int8 grade codes for a Series/array of grades; -1 for blanks and unknown values."""
+    if isinstance(values, (pd.Series, pd.Categorical)) and values.dtype == GRADE_DTYPE:
+        codes = values.cat.codes if isinstance(values, pd.Series) else values.codes
+        return np.asarray(codes, dtype=np.int8)
+    return GRADE_INDEX.get_indexer(pd.Index(values, dtype=object)).astype(np.int8)
+
+
+def from_codes(codes):
+    return pd.Categorical.from_codes(np.asarray(codes, dtype=np.int8), dtype=GRADE_DTYPE)
+
+
+def as_grades(values):
+    """Grades as the shared categorical type (unknown values become missing)."""
+    return from_codes(grade_codes(values))
+
+
+def as_grade_columns(df, id_columns=("IndexNumber", "Name")):
+    """Convert every module column of a combined results table to the grade type."""
+    return df.assign(**{
+        col: as_grades(df[col]) for col in df.columns if col not in id_columns
+    })
+
+
+def grade_distribution(df, modules):
+    """Modules x grades table of counts, counted on the grade codes."""
+    counts = [np.bincount(codes[codes >= 0], minlength=len(GRADES))
+              for codes in (grade_codes(df[module]) for module in modules)]
+    return pd.DataFrame(np.array(counts, dtype=np.int64).reshape(len(modules), len(GRADES)),
+                        index=pd.Index(modules, name="Module"), columns=GRADES)
@@ -0,0 +1,138 @@
+# incremental.py
+# Incremental GPA recomputation for the GPA Calculator.
+# Each module's aligned grades and its contribution to every student's
+# weighted-point and credit totals are kept, so adding, replacing or removing
+# one module (for example a late re-sit upload) only re-parses that PDF and
+# applies a delta to the totals instead of rebuilding the whole cohort.
+import numpy as np
+import pandas as pd
+
+from extraction import combine_results, extract_modules
+from gpa_engine import leaderboard, module_totals
+from instrumentation import stage
+from parse_cache import pdf_digest
+
+
+class IncrementalCohort:
+    """Per-module results and per-student running totals for one index.csv."""
+
+    def __init__(self, index_df, duplicates="last"):
+        self.index_df = index_df
+        self.duplicate_rule = duplicates
+        self.weighted = np.zeros(len(index_df), dtype=np.int64)
+        self.total_credits = np.zeros(len(index_df), dtype=np.int64)
+        # module -> dict(grades, matches, credit, source, weighted, credits, duplicates)
+        self._modules = {}
+
+    # -----------------------------
+    # Module updates
+    @property
+    def modules(self):
+        return list(self._modules)
+
+    @property
+    def module_credits(self):
+        return {name: module["credit"] for name, module in self._modules.items()}
+
+    def source(self, name):
+        """Whatever identifies the PDF last used for this module (e.g. its digest and engine)."""
+        module = self._modules.get(name)
+        return module["source"] if module else None
+
+    def matches(self, name):
+        return self._modules[name]["matches"]
+
+    def set_module(self, name, matches, credit, source=None):
+        """Add or replace a module; only this module's contribution is recomputed."""
+        if name in self._modules:
+            self._apply(self._modules.pop(name), -1)
+
+        matches = list(matches)
+        all_results, duplicates_df = combine_results(
+            self.index_df[["IndexNumber"]], [(name, matches)], self.duplicate_rule
+        )
+        grades = all_results[name].array  # categorical grade codes, one byte per student
+        weighted, credits = module_totals(grades, credit)
+        module = {
+            "grades": grades, "matches": matches, "credit": credit, "source": source,
+            "weighted": weighted, "credits": credits, "duplicates": duplicates_df,
+        }
+        self._modules[name] = module
+        self._apply(module, +1)
+
+    def set_credit(self, name, credit):
+        module = self._modules[name]
+        if module["credit"] == credit:
+            return
+        self._apply(module, -1)
+        module["credit"] = credit
+        module["weighted"], module["credits"] = module_totals(module["grades"], credit)
+        self._apply(module, +1)
+
+    def remove_module(self, name):
+        self._apply(self._modules.pop(name), -1)
+
+    def stale(self, module_info):
+        """The entries of [(name, credit, pdf_bytes, engine), ...] whose PDF or engine changed."""
+        return [(name, credit, pdf_bytes, engine) for name, credit, pdf_bytes, engine in module_info
+                if self.source(name) != (pdf_digest(pdf_bytes), engine)]
+
+    def sync(self, module_info, pattern, parsed=None):
+        """Bring the cohort in line with [(name, credit, pdf_bytes, engine), ...].
+
+        Only modules whose PDF or engine changed are re-parsed; a changed
+        credit is applied as a delta and modules no longer listed are dropped.
+        `parsed` may hold the matches of stale(module_info), in order, already
+        extracted elsewhere (e.g. by a background job).
+        Returns the names of the modules that were re-parsed.
+        """
+        with stage("sync") as record:
+            listed = {name for name, *_ in module_info}
+            for name in [m for m in self._modules if m not in listed]:
+                self.remove_module(name)
+
+            changed = []
+            for name, credit, pdf_bytes, engine in module_info:
+                source = (pdf_digest(pdf_bytes), engine)
+                if self.source(name) == source:
+                    self.set_credit(name, credit)
+                else:
+                    changed.append((name, credit, pdf_bytes, engine, source))
+
+            if changed:
+                if parsed is None:
+                    parsed = extract_modules([pdf_bytes for _, _, pdf_bytes, _, _ in changed], pattern,
+                                             engines=[engine for *_, engine, _ in changed])
+                elif len(parsed) != len(changed):
+                    raise ValueError(f"parsed holds {len(parsed)} match lists for {len(changed)} changed modules")
+                for (name, credit, _, _, source), matches in zip(changed, parsed):
+                    self.set_module(name, matches, credit, source)
+            record.update(modules=len(module_info), reparsed=len(changed))
+        return [name for name, *_ in changed]
+
+    def _apply(self, module, sign):
+        self.weighted += sign * module["weighted"]
+        self.total_credits += sign * module["credits"]
+
+    # -----------------------------
+    # Outputs
+    def all_results(self, modules=None):
+        """Combined results table with module columns in the given (or insertion) order."""
+        modules = self.modules if modules is None else modules
+        grades = pd.DataFrame(
+            {name: self._modules[name]["grades"] for name in modules}, index=self.index_df.index
+        )
+        return pd.concat([self.index_df, grades], axis=1)
+
+    def duplicates(self, modules=None):
+        modules = self.modules if modules is None else modules
+        frames = [self._modules[name]["duplicates"] for name in modules]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=["IndexNumber", "Module", "Occurrences", "Grades"])
+        return pd.concat(frames, ignore_index=True)
+
+    def leaderboard(self):
+        """GPA leaderboard from the running totals."""
+        return leaderboard(self.index_df["IndexNumber"].values, self.index_df["Name"].values,
+                           self.weighted, self.total_credits)
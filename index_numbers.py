@@ -0,0 +1,16 @@
+# index_numbers.py
+# IndexNumber normalisation shared by extraction and the result readers.
+# Kept apart from extraction.py so pages that only read CSVs or the results
+# store (Profile, Chatbot) do not import PyMuPDF.
+import pandas as pd
+
+
+def normalize_index_numbers(series):
+    """Return IndexNumbers as stripped strings so they match regex tokens."""
+    series = pd.Series(series)
+    if pd.api.types.is_float_dtype(series):
+        # read_csv turns an integer column with blanks into floats (210001.0)
+        present = series.dropna()
+        if (present == present.round()).all():
+            series = series.astype("Int64")
+    return series.astype("string").str.strip()
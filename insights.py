@@ -0,0 +1,228 @@
+# insights.py
+# Precomputed per-student insights for the Grade Insights Chatbot.
+# Weak/strong modules, GPA and rank are computed for the whole cohort in one
+# vectorized pass when a dataset is loaded; answering a message is then a
+# dictionary lookup plus string formatting. Cohort-wide questions (top N,
+# percentile, how many students above a GPA) are answered from a GPAIndex and
+# module questions (top N in a module, grade counts, my rank in a module,
+# module average) from a ModuleIndex.
+import re
+
+import numpy as np
+import pandas as pd
+
+from gpa_index import GPAIndex
+from grades import STRONG_GRADES, STRONG_MASK, WEAK_GRADES, WEAK_MASK
+from gpa_engine import grade_codes
+from index_numbers import normalize_index_numbers
+from module_index import ModuleIndex
+from profile_index import competition_rank
+
+
+# Word -> intent; when several intents appear, the first in INTENTS wins
+INTENTS = ("weak", "strong", "percentile", "ties", "top")
+INTENT_WORDS = {
+    "weak": "weak", "weaker": "weak", "weakest": "weak", "weakness": "weak",
+    "weaknesses": "weak", "concentrate": "weak",
+    "strong": "strong", "stronger": "strong", "strongest": "strong",
+    "strength": "strong", "strengths": "strong", "best": "strong",
+    "percentile": "percentile", "percent": "percentile",
+    "tie": "ties", "tied": "ties", "ties": "ties",
+    "top": "top", "first": "top",
+}
+_WORD = re.compile(r"[a-z]+")
+# "top 5", "above 3.5", "below 2", "between 3 and 3.5"
+_TOP_N = re.compile(r"\btop\s+(\d+)")
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_BETWEEN = re.compile(rf"\bbetween\s+{_NUMBER}\s+and\s+{_NUMBER}")
+_THRESHOLD = re.compile(rf"\b(above|over|below|under)\s+{_NUMBER}")
+# Module questions: "top 3 in CS1012", "how many A+ in CS1012", "my rank in
+# CS1012", "average of CS1012", "my grade in CS1012". Grades are matched
+# case-sensitively so "a" and "i" in a sentence are not read as grades.
+_GRADE_TOKEN = re.compile(r"(?<![\w+\-])(A\+|A-|A|B\+|B-|B|C\+|C-|C|D|I)(?![\w+\-])")
+_GRADE_I = re.compile(r"\b(?:many|of|got|get|an)\s+I(?![\w+\-])")
+_COUNT_WORDS = re.compile(r"\b(how many|count|number of)\b")
+_TOP_IN = re.compile(r"\b(?:top|best)\b(?:\s+(\d+))?")
+_RANK_WORDS = re.compile(r"\b(rank|ranked|position|place|stand)\b")
+_AVERAGE_WORDS = re.compile(r"\b(average|mean)\b")
+_GRADE_WORDS = re.compile(r"\b(grade|result|get|got)\b")
+_PERSONAL_WORDS = re.compile(r"\b(my|me|i)\b")
+
+
+def detect_intent(user_input):
+    found = {INTENT_WORDS[w] for w in _WORD.findall(user_input.lower()) if w in INTENT_WORDS}
+    return next((intent for intent in INTENTS if intent in found), None)
+
+
+def student_insight(student_row, grade_cols, gpa=None, rank=None):
+    """Insight for a single student row (used when reading one student from the store)."""
+    return {
+        "index_number": student_row["IndexNumber"],
+        "name": student_row["Name"],
+        "weak": [col for col in grade_cols if student_row[col] in WEAK_GRADES],
+        "strong": [col for col in grade_cols if student_row[col] in STRONG_GRADES],
+        "gpa": gpa,
+        "rank": rank,
+    }
+
+
+def cohort_reply(user_input, gpa_index):
+    """Answer a top-N or GPA-range question from a GPAIndex; None if the message is neither."""
+    text = user_input.lower()
+    top_n = _TOP_N.search(text)
+    if top_n:
+        if len(gpa_index) == 0:
+            return "No GPAs have been published for this batch yet."
+        n = int(top_n.group(1))
+        if n == 0:
+            return "Ask for the top 1 or more students, e.g. 'top 5'."
+        top = gpa_index.top_rows(n)
+        return f"The top {len(top)} students are: " + "; ".join(
+            f"{rank}. {name} ({gpa})" for _, name, gpa, rank in top)
+    between = _BETWEEN.search(text)
+    if between:
+        low, high = sorted(float(value) for value in between.groups())
+        return f"{gpa_index.count_between(low, high)} students have a GPA between {low} and {high}."
+    threshold = _THRESHOLD.search(text)
+    if threshold:
+        word, value = threshold.group(1), float(threshold.group(2))
+        if word in ("above", "over"):
+            return f"{gpa_index.count_above(value)} students have a GPA above {value}."
+        return f"{gpa_index.count_below(value)} students have a GPA below {value}."
+    return None
+
+
+def asked_grade(user_input, module):
+    """The grade a count question asks about, ignoring the module name and the pronoun "I"."""
+    text = re.sub(re.escape(module), " ", user_input, flags=re.I)
+    grades = [g for g in _GRADE_TOKEN.findall(text) if g != "I"]
+    if grades:
+        return grades[0]
+    return "I" if _GRADE_I.search(text) else None
+
+
+def module_reply(user_input, insight, module_index):
+    """Answer a question about a module named in the message; None if no module is named."""
+    module = module_index.find_module(user_input)
+    if module is None:
+        return None
+    text = user_input.lower()
+
+    if _COUNT_WORDS.search(text):
+        grade = asked_grade(user_input, module)
+        if grade is not None:
+            return f"{module_index.grade_count(module, grade)} students got {grade} in {module}."
+    if _AVERAGE_WORDS.search(text):
+        average, graded = module_index.module_average(module)
+        if not graded:
+            return f"Nobody has a grade in {module} yet."
+        return f"The average grade point in {module} is {average:.2f} over {graded} students."
+    # "my best grade in X" is about the student, "best students in X" about the module
+    personal = _PERSONAL_WORDS.search(text) and (_RANK_WORDS.search(text) or _GRADE_WORDS.search(text))
+    top = _TOP_IN.search(text)
+    if top and not personal:
+        n = int(top.group(1)) if top.group(1) else (5 if "students" in text else 1)
+        leaders = module_index.top_rows(module, n)
+        if not leaders:
+            return f"Nobody has a grade in {module} yet."
+        return f"Top {len(leaders)} in {module}: " + "; ".join(
+            f"{rank}. {name} ({grade})" for _, name, grade, rank in leaders)
+    if _RANK_WORDS.search(text) or _GRADE_WORDS.search(text):
+        standing = module_index.rank(module, insight.get("index_number", ""))
+        if standing is None:
+            return f"You do not have a grade in {module}."
+        rank, graded, grade = standing
+        if _RANK_WORDS.search(text):
+            return f"You are ranked {rank} of {graded} in {module} with {grade}."
+        return f"Your grade in {module} is {grade}."
+    return None
+
+
+def reply(user_input, insight, top_student, gpa_index=None, module_index=None):
+    """Answer a chat message from a precomputed insight; top_student is a {Name, GPA} mapping.
+
+    With a GPAIndex of the cohort, top-N, GPA-range, percentile and tie
+    questions are answered too; with a ModuleIndex, questions about a named
+    module.
+    """
+    if module_index is not None:
+        answer = module_reply(user_input, insight, module_index)
+        if answer is not None:
+            return answer
+    if gpa_index is not None:
+        answer = cohort_reply(user_input, gpa_index)
+        if answer is not None:
+            return answer
+    intent = detect_intent(user_input)
+    if intent == "weak":
+        if insight["weak"]:
+            return "You should concentrate more on: " + ", ".join(insight["weak"])
+        return "Great! No weak modules found."
+    if intent == "strong":
+        if insight["strong"]:
+            return "You performed well in: " + ", ".join(insight["strong"])
+        return "Keep improving! No modules with top grades yet."
+    if intent in ("percentile", "ties") and gpa_index is not None:
+        if insight["gpa"] is None or pd.isna(insight["gpa"]):
+            return "You do not have a GPA in this batch yet."
+        if intent == "percentile":
+            return (f"Your GPA {insight['gpa']} puts you at percentile {gpa_index.percentile(insight['gpa']):.1f}; "
+                    f"{gpa_index.count_above(insight['gpa'])} students are ahead of you.")
+        tied = gpa_index.ties(insight["gpa"])
+        others = tied["Name"].tolist()
+        if insight["name"] in others:
+            others.remove(insight["name"])
+        if not others:
+            return f"Nobody else shares your GPA of {insight['gpa']}."
+        return f"{len(others)} other students share your GPA of {insight['gpa']}: " + ", ".join(others)
+    if intent == "top" and top_student is not None:
+        return f"The top student in the batch is: {top_student['Name']} with GPA {top_student['GPA']}"
+    return ("Sorry, I can only answer questions about your strong/weak modules, your percentile, "
+            "the top students, how many students are above a GPA, or a module "
+            "(top students, grade counts, your rank, average).")
+
+
+class CohortInsights:
+    """Insight table for every student in a combined results / GPA dataset."""
+
+    def __init__(self, combined_df, gpa_df):
+        self.grade_cols = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
+        codes = grade_codes(combined_df, self.grade_cols)
+        weak_rows, weak_cols = np.nonzero(WEAK_MASK[codes])
+        strong_rows, strong_cols = np.nonzero(STRONG_MASK[codes])
+        modules = np.array(self.grade_cols, dtype=object)
+
+        def per_row(rows, cols):
+            # np.nonzero returns row-major order, so each row's modules stay in column order
+            split = np.searchsorted(rows, np.arange(1, len(combined_df)))
+            return [m.tolist() for m in np.split(modules[cols], split)]
+
+        weak = per_row(weak_rows, weak_cols)
+        strong = per_row(strong_rows, strong_cols)
+
+        gpa_keys = normalize_index_numbers(gpa_df["IndexNumber"]).tolist()
+        ranks = competition_rank(gpa_df["GPA"]).tolist()
+        gpa_by_key = {}
+        for key, gpa, rank in zip(gpa_keys, gpa_df["GPA"].tolist(), ranks):
+            gpa_by_key.setdefault(key, (gpa, rank))
+
+        self._students = {}
+        keys = normalize_index_numbers(combined_df["IndexNumber"]).tolist()
+        for i, (key, name) in enumerate(zip(keys, combined_df["Name"].tolist())):
+            if pd.isna(key) or key in self._students:
+                continue
+            gpa, rank = gpa_by_key.get(key, (None, None))
+            self._students[key] = {"index_number": key, "name": name, "weak": weak[i],
+                                   "strong": strong[i], "gpa": gpa, "rank": rank}
+
+        # Sorted once; highest GPA first, file order on ties, whatever the CSV's order
+        self.gpa_index = GPAIndex.from_frame(gpa_df)
+        top = self.gpa_index.top(1)
+        self.top_student = top.iloc[0] if len(top) else None
+        self.module_index = ModuleIndex(combined_df)
+
+    def __contains__(self, index_number):
+        return str(index_number).strip() in self._students
+
+    def student(self, index_number):
+        return self._students.get(str(index_number).strip())
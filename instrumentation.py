@@ -0,0 +1,160 @@
+# instrumentation.py
+# Lightweight per-stage timing and memory instrumentation.
+# Pipeline stages (PDF open, get_text, regex, join, combine, GPA, ...) are
+# wrapped in stage() blocks. Inside a recording() block each stage records wall
+# time, its counters (pages, bytes, matches, ...) and peak traced memory, and
+# is written to the "resultpy.metrics" logger as one JSON line. Outside a
+# recording stage() returns a shared no-op, so the cost when switched off is
+# one thread-local lookup per stage.
+#
+# Set RESULTPY_METRICS=1 to record every run; RESULTPY_METRICS_LOG=<path>
+# sends the JSON lines to a file instead of stderr.
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.environ.get("RESULTPY_METRICS", "").lower() in ("1", "true", "yes")
+METRICS_LOG = os.environ.get("RESULTPY_METRICS_LOG")
+
+logger = logging.getLogger("resultpy.metrics")
+_local = threading.local()
+_handler_lock = threading.Lock()
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+class _NullStage:
+    """Stand-in for a stage record when nothing is recording; ignores every update."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Recorder:
+    """Stage records for one run (a page render, a batch job, ...)."""
+
+    def __init__(self, run, trace_memory=True):
+        self.run = run
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._open = []  # [record, absolute peak so far] for stages in progress
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, **counts):
+        record = {"run": self.run, "stage": name, "depth": len(self._open), **counts}
+        self.stages.append(record)  # in start order, so outer stages come before inner ones
+        frame = [record, 0]
+        start_memory = self._enter_memory(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            if self.trace_memory:
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                for outer in self._open[:-1]:
+                    outer[1] = max(outer[1], peak)
+                record["peak_bytes"] = max(peak - start_memory, 0)
+            self._open.pop()
+            logger.info(json.dumps(record, default=str))
+
+    def record(self, name, seconds, **counts):
+        """Add a stage that was timed elsewhere (e.g. accumulated over a page loop)."""
+        record = {"run": self.run, "stage": name, "depth": len(self._open),
+                  **counts, "seconds": round(seconds, 6)}
+        self.stages.append(record)
+        logger.info(json.dumps(record, default=str))
+
+    def adopt(self, stages):
+        """Add stages recorded by another thread (already logged there) under the open stage."""
+        depth = len(self._open)
+        self.stages.extend({**record, "run": self.run, "depth": record["depth"] + depth} for record in stages)
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self._started
+
+    def _enter_memory(self, frame):
+        start_memory = 0
+        if self.trace_memory:
+            # Fold the current peak into every open stage before resetting it
+            start_memory, peak = tracemalloc.get_traced_memory()
+            for outer in self._open:
+                outer[1] = max(outer[1], peak)
+            tracemalloc.reset_peak()
+        self._open.append(frame)
+        return start_memory
+
+
+def current():
+    """The recorder for this thread, or None when nothing is recording."""
+    return getattr(_local, "recorder", None)
+
+
+def stage(name, **counts):
+    """Context manager timing one pipeline stage; yields a dict for extra counters."""
+    recorder = getattr(_local, "recorder", None)
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name, **counts)
+
+
+@contextmanager
+def recording(run, trace_memory=True):
+    """Record every stage run by this thread inside the block.
+
+    tracemalloc is process-wide, so peaks of runs that overlap in other
+    threads (other Streamlit sessions) are approximate.
+    """
+    global _tracing_users, _started_tracing
+    _configure_logging()
+    recorder = Recorder(run, trace_memory)
+    previous = current()
+    _local.recorder = recorder
+    if trace_memory:
+        with _tracing_lock:
+            if _tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            _tracing_users += 1
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+        if trace_memory:
+            with _tracing_lock:
+                _tracing_users -= 1
+                if _tracing_users == 0 and _started_tracing:
+                    tracemalloc.stop()
+                    _started_tracing = False
+
+
+def _configure_logging():
+    # JSON lines go to stderr (or RESULTPY_METRICS_LOG) unless the app configured the logger
+    with _handler_lock:
+        if logger.handlers:
+            return
+        handler = logging.FileHandler(METRICS_LOG) if METRICS_LOG else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
@@ -0,0 +1,127 @@
+# jobs.py
+# Background jobs owned by the server process.
+# Long extraction work is submitted under a key derived from its inputs (PDF
+# digest, engine, ...). A Streamlit rerun that asks for the same key gets the
+# job that is already running, or its finished result, instead of starting the
+# parse again, so touching a widget mid-parse no longer throws work away.
+# Jobs report (fraction, text) progress that the page shows in st.progress.
+# Stage recording is thread-local, so a job submitted while a page run is
+# being recorded (or with RESULTPY_METRICS set) records its own stages in the
+# worker thread; wait() hands them back to the page's recorder.
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import METRICS_ENABLED, current, recording
+
+JOB_WORKERS = int(os.environ.get("RESULTPY_JOB_WORKERS", 2))
+# Finished jobs kept for reruns and other sessions; running jobs are never dropped
+MAX_FINISHED_JOBS = 64
+
+
+class Job:
+    """One submitted job: its future plus the latest progress it reported."""
+
+    def __init__(self, key):
+        self.key = key
+        self.fraction = 0.0
+        self.text = "Queued"
+        self.submitted = time.time()
+        self.future = None
+        self.stages = []  # stage records of the run, when it was recorded
+
+    def report(self, fraction, text=None):
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        if text is not None:
+            self.text = text
+
+    def done(self):
+        return self.future.done()
+
+    def failed(self):
+        return self.future.done() and self.future.exception() is not None
+
+    def result(self):
+        """The job's return value; re-raises the job's exception."""
+        return self.future.result()
+
+
+class JobRunner:
+    """Thread pool of keyed jobs; submitting a known key returns the existing job."""
+
+    def __init__(self, max_workers=JOB_WORKERS, max_finished=MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resultpy-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Run fn(*args, progress=job.report, **kwargs) once per key.
+
+        A failed job is replaced on the next submit so the user can retry.
+        """
+        parent = current()
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.failed():
+                self._jobs.move_to_end(key)
+                return job
+            job = Job(key)
+            job.future = self._pool.submit(self._run, job, fn, args, kwargs, parent)
+            self._jobs[key] = job
+            self._evict()
+            return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def discard(self, key):
+        """Forget a finished job, so the next submit runs it again."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.done():
+                del self._jobs[key]
+
+    def _run(self, job, fn, args, kwargs, parent):
+        job.report(0.0, "Starting")
+        if parent is None and not METRICS_ENABLED:
+            result = fn(*args, progress=job.report, **kwargs)
+        else:
+            # Stages are logged here as they finish, under the submitting run's name
+            run = parent.run if parent is not None else f"job:{job.key[0]}"
+            trace_memory = parent.trace_memory if parent is not None else True
+            with recording(run, trace_memory) as recorder:
+                try:
+                    result = fn(*args, progress=job.report, **kwargs)
+                finally:
+                    job.stages = recorder.stages
+        job.report(1.0, "Done")
+        return result
+
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if job.done()]
+        for key in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[key]
+
+
+JOBS = JobRunner()
+
+
+def wait(job, bar, poll=0.2):
+    """Block until the job finishes, updating a st.progress bar; returns the result.
+
+    If the user touches a widget meanwhile, Streamlit restarts the script at
+    the next bar update and the rerun simply waits on the same job again.
+    The job's recorded stages are added to this thread's recorder, if any.
+    """
+    while not job.done():
+        bar.progress(job.fraction, text=job.text)
+        time.sleep(poll)
+    bar.empty()
+    recorder = current()
+    if recorder is not None and job.stages:
+        recorder.adopt(job.stages)
+    return job.result()
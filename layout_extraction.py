@@ -0,0 +1,93 @@
+# layout_extraction.py
+# Layout-aware extraction for tabular result sheets.
+# Instead of running the grade regex over flattened text, the IndexNumber and
+# Grade columns are located once from the header row geometry and every
+# following row is read by its y-coordinate. Text outside those columns
+# (titles, module codes, footers) can no longer produce false matches.
+import re
+
+from grades import GRADES
+from uploads import open_pdf
+
+INDEX_HEADER = re.compile(r"^(index|indexnumber|index\s*no\.?|index\s*number|reg\.?\s*no\.?|registration\s*(no\.?|number))$", re.I)
+GRADE_HEADER = re.compile(r"^(grade|grades|result|results)$", re.I)
+INDEX_TOKEN = re.compile(r"^[0-9A-Za-z]+$")
+GRADE_SET = frozenset(GRADES)
+
+
+def group_rows(words):
+    """Group PyMuPDF words into rows by vertical centre, top to bottom."""
+    words = sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+    rows = []
+    for word in words:
+        centre = (word[1] + word[3]) / 2
+        tolerance = (word[3] - word[1]) / 2
+        if rows and abs(centre - rows[-1][0]) <= tolerance:
+            rows[-1][1].append(word)
+        else:
+            rows.append((centre, [word]))
+    return [sorted(row, key=lambda w: w[0]) for _, row in rows]
+
+
+def header_cells(row):
+    """Merge words separated by less than half a line height into header cells."""
+    cells = []
+    for x0, y0, x1, y1, text, *_ in row:
+        if cells and x0 - cells[-1][1] < (y1 - y0) / 2:
+            cells[-1] = (cells[-1][0], x1, f"{cells[-1][2]} {text}")
+        else:
+            cells.append((x0, x1, text))
+    return cells
+
+
+def find_columns(row):
+    """Return the x-ranges of the IndexNumber and Grade columns, or None.
+
+    Each header cell owns the space up to the midpoint with its neighbours.
+    """
+    cells = header_cells(row)
+    index_col = next((i for i, c in enumerate(cells) if INDEX_HEADER.match(c[2].strip())), None)
+    grade_col = next((i for i, c in enumerate(cells) if GRADE_HEADER.match(c[2].strip())), None)
+    if index_col is None or grade_col is None:
+        return None
+
+    def span(i):
+        left = (cells[i - 1][1] + cells[i][0]) / 2 if i > 0 else float("-inf")
+        right = (cells[i][1] + cells[i + 1][0]) / 2 if i + 1 < len(cells) else float("inf")
+        return left, right
+
+    return span(index_col), span(grade_col)
+
+
+def read_cell(row, column):
+    left, right = column
+    parts = [w[4] for w in row if left <= (w[0] + w[2]) / 2 < right and w[4] != "|"]
+    return "".join(parts)
+
+
+def has_header_row(pdf_bytes):
+    """Whether parse_matches_layout would find the column header (it stops at the first one)."""
+    with open_pdf(pdf_bytes) as doc:
+        return any(find_columns(row) is not None
+                   for page in doc for row in group_rows(page.get_text("words")))
+
+
+def parse_matches_layout(pdf_bytes, progress=None):
+    """Return (IndexNumber, Grade) rows read by column, or None if no header row is found.
+
+    `progress(fraction, text)` is called after each page.
+    """
+    columns = None
+    matches = []
+    with open_pdf(pdf_bytes) as doc:
+        for page_no, page in enumerate(doc, start=1):
+            if progress is not None:
+                progress((page_no - 1) / doc.page_count, f"Page {page_no} of {doc.page_count}")
+            for row in group_rows(page.get_text("words")):
+                if columns is None:
+                    columns = find_columns(row)
+                    continue
+                index, grade = read_cell(row, columns[0]), read_cell(row, columns[1])
+                if grade in GRADE_SET and INDEX_TOKEN.match(index):
+                    matches.append((index, grade))
+    return matches if columns is not None else None
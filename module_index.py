@@ -0,0 +1,89 @@
+# module_index.py
+# Per-module grade indexes for the chatbot's module questions.
+# Built once per dataset: for every module the students are sorted by grade
+# code (best first, ungraded last) and the grade counts are tallied, so "top N
+# in a module", "how many A+ in a module", "my rank in a module" and "module
+# average" are slices and table lookups instead of scans of the results.
+import re
+
+import numpy as np
+import pandas as pd
+
+from gpa_engine import POINTS_LOOKUP, grade_codes
+from grades import GRADES, UNGRADED
+from index_numbers import normalize_index_numbers
+from profile_index import position_index
+
+# Grade points indexed by grade code, without the ungraded slot
+_POINTS = POINTS_LOOKUP[:len(GRADES)]
+
+
+class ModuleIndex:
+    """Grade-sorted students and grade counts for every module of a combined results table."""
+
+    def __init__(self, combined_df):
+        self.modules = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
+        self._column = {module: i for i, module in enumerate(self.modules)}
+        self.index_numbers = normalize_index_numbers(combined_df["IndexNumber"]).to_numpy(dtype=object)
+        self.names = combined_df["Name"].to_numpy(dtype=object)
+        self._positions = position_index(combined_df["IndexNumber"])
+
+        self.codes = grade_codes(combined_df, self.modules)
+        # Ungraded cells sort after every grade; stable, so ties keep file order
+        sort_codes = np.where(self.codes == UNGRADED, len(GRADES), self.codes)
+        self._order = np.argsort(sort_codes, axis=0, kind="stable").astype(np.int32)
+
+        graded = self.codes != UNGRADED
+        cols = np.broadcast_to(np.arange(len(self.modules)), self.codes.shape)[graded]
+        self.counts = np.bincount(cols * len(GRADES) + self.codes[graded],
+                                  minlength=len(self.modules) * len(GRADES)).reshape(len(self.modules), len(GRADES))
+        self.graded = self.counts.sum(axis=1)
+        # better[m, c]: students in module m with a grade strictly better than code c
+        self._better = np.cumsum(self.counts, axis=1) - self.counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.average = self.counts @ _POINTS / self.graded
+
+        # Longest module names first, so "CS1012 Lab" wins over "CS1012"
+        names = sorted(self.modules, key=len, reverse=True)
+        self._module_pattern = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(name) for name in names) + r")(?!\w)", re.I,
+        ) if names else None
+        self._by_lower = {name.lower(): name for name in reversed(self.modules)}
+
+    def find_module(self, text):
+        """The module named in `text` (case-insensitive), or None."""
+        if self._module_pattern is None:
+            return None
+        found = self._module_pattern.search(text)
+        return self._by_lower[found.group(1).lower()] if found else None
+
+    def top_rows(self, module, n=5):
+        """The n best grades in a module as (IndexNumber, Name, Grade, Rank) tuples."""
+        m = self._column[module]
+        rows = self._order[:min(max(int(n), 0), self.graded[m]), m]
+        codes = self.codes[rows, m]
+        return list(zip(self.index_numbers[rows].tolist(), self.names[rows].tolist(),
+                        [GRADES[code] for code in codes.tolist()], (self._better[m, codes] + 1).tolist()))
+
+    def top(self, module, n=5):
+        """top_rows() as a DataFrame."""
+        return pd.DataFrame(self.top_rows(module, n), columns=["IndexNumber", "Name", "Grade", "Rank"])
+
+    def grade_count(self, module, grade):
+        return int(self.counts[self._column[module], GRADES.index(grade)])
+
+    def rank(self, module, index_number):
+        """(rank, graded students, grade) of a student in a module; None if not graded there."""
+        position = self._positions.get(str(index_number).strip())
+        if position is None:
+            return None
+        m = self._column[module]
+        code = self.codes[position, m]
+        if code == UNGRADED:
+            return None
+        return int(self._better[m, code]) + 1, int(self.graded[m]), GRADES[code]
+
+    def module_average(self, module):
+        """(mean grade point, graded students) of a module; the mean is NaN if nobody is graded."""
+        m = self._column[module]
+        return float(self.average[m]), int(self.graded[m])
@@ -0,0 +1,98 @@
+# page_data.py
+# Dataset loaders and report helpers shared by the homepage features (feature_*.py)
+# and the standalone pages. Loaded objects live in the process-wide DATASETS
+# registry under the keys built here, so both sets of pages share one copy of
+# each dataset. Does not load PyMuPDF.
+import atexit
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+
+import streamlit as st
+
+from cohort_analytics import CohortAnalytics
+from datasets import DATASETS, read_csv_upload, upload_digest
+from gpa_index import GPAIndex
+from insights import CohortInsights
+from jobs import JOBS, wait
+from module_index import ModuleIndex
+from profile_index import ProfileIndex
+from profile_reports import REPORT_FORMATS, report_file
+from results_store import ResultsStore
+
+# Report zips kept on disk for download; the oldest beyond this are deleted
+MAX_REPORT_FILES = 16
+
+
+# -----------------------------
+# Uploaded CSVs: one shared, read-only object per pair of files for every session on the server
+def load_profile_index(digests, combined_file, gpa_file):
+    # digests: the upload_digest() of both files, which the page also keys its report jobs on
+    return DATASETS.get(("profile",) + digests,
+                        lambda: ProfileIndex(read_csv_upload(combined_file), read_csv_upload(gpa_file)))
+
+def load_insights(combined_file, gpa_file):
+    return DATASETS.get(("insights", upload_digest(combined_file), upload_digest(gpa_file)),
+                        lambda: CohortInsights(read_csv_upload(combined_file), read_csv_upload(gpa_file)))
+
+
+# -----------------------------
+# Published cohorts: keyed on the publish time so a republished cohort is re-indexed
+def load_cohort_gpa_index(cohort_id, published_at):
+    return DATASETS.get(("gpa_index", cohort_id, published_at),
+                        lambda: GPAIndex.from_frame(ResultsStore().leaderboard(cohort_id)))
+
+def load_cohort_module_index(cohort_id, published_at):
+    # Per-module sorted indexes need the whole cohort, read once per publish
+    return DATASETS.get(("module_index", cohort_id, published_at),
+                        lambda: ModuleIndex(ResultsStore().cohort(cohort_id)[0]))
+
+
+# -----------------------------
+# Aggregates are keyed on the dataset hash, so reruns and filter changes reuse them
+def load_analytics(dataset_key, load_combined):
+    return DATASETS.get(("analytics",) + dataset_key, lambda: CohortAnalytics(load_combined()))
+
+
+# -----------------------------
+# Bulk profile reports. Jobs write the zip to a private temporary directory
+# and return its path, so finished jobs do not hold report bytes in memory.
+@functools.lru_cache(maxsize=None)
+def reports_dir():
+    path = tempfile.mkdtemp(prefix="resultpy-reports-")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def build_reports(load_index, fmt, path, progress=None):
+    report_file(load_index(), path, fmt, progress=progress)
+    zips = [os.path.join(reports_dir(), name) for name in os.listdir(reports_dir()) if name.endswith(".zip")]
+    finished = sorted((zip_path for zip_path in zips if ".part." not in zip_path), key=os.path.getmtime)
+    for old in finished[:max(len(finished) - MAX_REPORT_FILES, 0)]:
+        os.remove(old)
+    return path
+
+def bulk_reports(source_key, load_index, key_prefix=""):
+    # Every student's profile rendered in a background job, offered as one zip
+    with st.expander("📦 Reports for the whole cohort"):
+        fmt = st.radio("Report format", REPORT_FORMATS, horizontal=True, key=f"{key_prefix}report_format")
+        job_key = ("profile_reports", source_key, fmt)
+        path = os.path.join(reports_dir(), hashlib.sha256(repr(job_key).encode()).hexdigest()[:32] + ".zip")
+        job = JOBS.get(job_key)
+        if job is not None and job.done() and not job.failed() and not os.path.exists(path):
+            # The zip was deleted to make room for newer ones; render it again on request
+            JOBS.discard(job_key)
+            job = None
+        if st.button("Generate reports", key=f"{key_prefix}reports"):
+            job = JOBS.submit(job_key, build_reports, load_index, fmt, path)
+        if job is None:
+            return
+        reports = wait(job, st.progress(0.0, text="⏳ Rendering reports..."))
+        try:
+            with open(reports, "rb") as f:
+                st.download_button("⬇️ Download reports (zip)", f, file_name=f"profile_reports_{fmt}.zip",
+                                   mime="application/zip", key=f"{key_prefix}reports_download")
+        except FileNotFoundError:
+            JOBS.discard(job_key)
+            st.info("These reports were cleared to make room for newer ones. Generate them again.")
@@ -0,0 +1,138 @@
+# parse_cache.py
+# Content-hash keyed cache for parsed result PDFs.
+# Streamlit reruns the whole script on every widget change, so without this
+# every module PDF is re-opened and re-scanned on each keystroke.
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Bump when the extraction logic changes in a way that alters matches
+PATTERN_VERSION = 1
+
+
+def pdf_digest(pdf_bytes):
+    # Spooled uploads (uploads.SpooledPDF) already carry their SHA-256
+    digest = getattr(pdf_bytes, "digest", None)
+    return digest or hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def cache_key(pdf_bytes, pattern, digest=None):
+    """SHA-256 of the PDF plus the extraction pattern and its version."""
+    digest = digest or pdf_digest(pdf_bytes)
+    pattern_id = hashlib.sha1(f"{PATTERN_VERSION}:{pattern}".encode("utf-8")).hexdigest()[:12]
+    return f"{digest}-{pattern_id}"
+
+
+class ParseCache:
+    """In-memory LRU of parsed matches with an optional size-bounded disk tier."""
+
+    def __init__(self, max_entries=64, disk_dir=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # -----------------------------
+    # Public API
+    def get_or_parse(self, pdf_bytes, pattern, parse, digest=None):
+        """Return cached matches for this PDF, calling parse(pdf_bytes, pattern) on a miss."""
+        key = cache_key(pdf_bytes, pattern, digest)
+        matches = self.get(key)
+        if matches is None:
+            matches = [tuple(m) for m in parse(pdf_bytes, pattern)]
+            self.put(key, matches)
+        return list(matches)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        matches = self._read_disk(key)
+        if matches is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._remember(key, matches)
+        return matches
+
+    def put(self, key, matches):
+        self._remember(key, matches)
+        self._write_disk(key, matches)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    # -----------------------------
+    # Memory tier
+    def _remember(self, key, matches):
+        with self._lock:
+            self._memory[key] = matches
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # -----------------------------
+    # Disk tier
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                matches = [tuple(m) for m in json.load(f)]
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError):
+            return None
+        return matches
+
+    def _write_disk(self, key, matches):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(matches, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+# One cache per server process; set RESULTPY_PARSE_CACHE_DIR to keep parses across restarts
+PARSE_CACHE = ParseCache(disk_dir=os.environ.get("RESULTPY_PARSE_CACHE_DIR"))
@@ -0,0 +1,53 @@
+# perf_panel.py
+# Optional Streamlit sidebar panel for the stage instrumentation.
+# A page run wrapped in profiled() is recorded when the sidebar checkbox is on
+# (or RESULTPY_METRICS is set) and the recorded stages are shown in the sidebar.
+from contextlib import contextmanager
+
+import streamlit as st
+
+from instrumentation import METRICS_ENABLED, recording
+
+PANEL_COLUMNS = ["stage", "dataset", "seconds", "pages", "MB", "matches", "rows", "students", "cached", "peak MB"]
+
+
+@contextmanager
+def profiled(run, key="perf_panel"):
+    """Record the stages of one page run; yields the Recorder, or None when switched off."""
+    show = st.sidebar.checkbox("⏱️ Show performance panel", key=key)
+    if not (show or METRICS_ENABLED):
+        yield None
+        return
+
+    with recording(run) as recorder:
+        try:
+            yield recorder
+        finally:
+            # Not shown when the page ended early with st.stop()
+            if show:
+                render(recorder)
+
+
+def render(recorder):
+    import pandas as pd  # only needed once the panel is shown
+    from datasets import DATASETS
+
+    st.sidebar.subheader("⏱️ Performance")
+    cache = DATASETS.stats()
+    st.sidebar.caption(
+        f"Shared datasets: {cache['entries']} entries, {cache['bytes'] / 1e6:.1f} of "
+        f"{cache['max_bytes'] / 1e6:.0f} MB; {cache['hits']} hits, {cache['misses']} misses, "
+        f"{cache['evictions']} evictions ({cache['evicted_bytes'] / 1e6:.1f} MB)"
+    )
+    if not recorder.stages:
+        st.sidebar.caption("No pipeline stages ran on this page yet.")
+        return
+
+    stages = pd.DataFrame(recorder.stages)
+    stages["stage"] = ["· " * depth + name for depth, name in zip(stages["depth"], stages["stage"])]
+    if "bytes" in stages:
+        stages["MB"] = (stages["bytes"] / 1e6).round(2)
+    if "peak_bytes" in stages:
+        stages["peak MB"] = (stages["peak_bytes"] / 1e6).round(2)
+    st.sidebar.dataframe(stages[[col for col in PANEL_COLUMNS if col in stages]], hide_index=True)
+    st.sidebar.caption(f"Page run: {recorder.total_seconds:.3f}s (stages inside parallel workers are not broken down)")
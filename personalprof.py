@@ -1,6 +1,12 @@
 import streamlit as st
 import pandas as pd
 
+from choices import RESULT_SOURCES
+from datasets import upload_digest
+from page_data import bulk_reports, load_cohort_gpa_index, load_profile_index
+from profile_index import ProfileIndex
+from results_store import ResultsStore
+
 def app():
 
     def main():
@@ -49,69 +55,112 @@ def app():
 
         st.title("👤 Personalized Academic Profile")
 
-        # Upload combined results
-        combined_file = st.file_uploader("Upload Combined Results CSV", type="csv")
-        gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv")
+        source = st.radio("Results source", RESULT_SOURCES, horizontal=True)
+
+        if source == "Published cohort":
+            store = ResultsStore()
+            cohorts = store.list_cohorts()
+            if not cohorts:
+                st.info("No published cohorts yet. Publish one from the GPA Calculator.")
+                st.stop()
+            cohort_id = st.selectbox("Cohort", cohorts)
+            bulk_reports(("store", cohort_id, store.published_at(cohort_id)),
+                         lambda: ProfileIndex(*store.cohort(cohort_id)))
+
+            # User input
+            index_number = st.text_input("Enter your Index Number:")
+            if not index_number:
+                return
 
-        if not combined_file or not gpa_file:
-            st.stop()
+            # Indexed single-student read instead of loading both tables
+            student = store.student(cohort_id, index_number)
+            if student is None:
+                st.error("Index Number not found!")
+                return
+            student_row, gpa_row = student
+            rank = gpa_row["Rank"]
+            total_students = store.count(cohort_id)
+            grade_cols = store.modules(cohort_id)
+            gpa_index = load_cohort_gpa_index(cohort_id, store.published_at(cohort_id))
+        else:
+            # Upload combined results
+            combined_file = st.file_uploader("Upload Combined Results CSV", type="csv")
+            gpa_file = st.file_uploader("Upload GPA Results CSV", type="csv")
+
+            if not combined_file or not gpa_file:
+                st.stop()
+
+            # Lookup and rank index, built once per pair of uploads and shared across sessions
+            digests = (upload_digest(combined_file), upload_digest(gpa_file))
+            profile_index = load_profile_index(digests, combined_file, gpa_file)
+            combined_df, gpa_df = profile_index.combined_df, profile_index.gpa_df
+            bulk_reports(("csv",) + digests,
+                         lambda: profile_index)
+
+            st.subheader("✅ Uploaded Data Previews")
+            st.write("Combined Results:")
+            st.dataframe(combined_df.head())
+            st.write("GPA Results:")
+            st.dataframe(gpa_df.head())
+
+            # User input
+            index_number = st.text_input("Enter your Index Number:")
+            if not index_number:
+                return
 
-        combined_df = pd.read_csv(combined_file)
-        gpa_df = pd.read_csv(gpa_file)
+            student = profile_index.lookup(index_number)
+            if student is None or student[1] is None:
+                st.error("Index Number not found!")
+                return
 
-        st.subheader("✅ Uploaded Data Previews")
-        st.write("Combined Results:")
-        st.dataframe(combined_df.head())
-        st.write("GPA Results:")
-        st.dataframe(gpa_df.head())
+            student_row, gpa_row = student
+            rank = gpa_row["Rank"]
+            total_students = profile_index.total_students
+            grade_cols = profile_index.grade_cols
+            gpa_index = profile_index.gpa_index
 
-        # User input
-        index_number = st.text_input("Enter your Index Number:")
+        # Horizontal cards for Name, GPA, Rank, Percentile
+        st.markdown('<div class="profile-card">', unsafe_allow_html=True)
 
-        if index_number:
-            if index_number not in combined_df["IndexNumber"].values:
-                st.error("Index Number not found!")
-                return
+        st.markdown(f"""
+            <div class="card">
+                <h3>👤 Name</h3>
+                <p>{student_row['Name']}</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown(f"""
+            <div class="card">
+                <h3>📊 GPA</h3>
+                <p>{gpa_row['GPA']}</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown(f"""
+            <div class="card">
+                <h3>🏆 Rank</h3>
+                <p>{rank} / {total_students}</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        # Percentile from the sorted GPA index (binary search, not a cohort scan)
+        percentile = f"{gpa_index.percentile(gpa_row['GPA']):.1f}" if pd.notna(gpa_row["GPA"]) else "-"
+        st.markdown(f"""
+            <div class="card">
+                <h3>📈 Percentile</h3>
+                <p>{percentile}</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        st.markdown('</div>', unsafe_allow_html=True)
 
-            student_row = combined_df[combined_df["IndexNumber"] == index_number].iloc[0]
-            gpa_row = gpa_df[gpa_df["IndexNumber"] == index_number].iloc[0]
-
-            # Horizontal cards for Name, GPA, Rank
-            st.markdown('<div class="profile-card">', unsafe_allow_html=True)
-
-            st.markdown(f"""
-                <div class="card">
-                    <h3>👤 Name</h3>
-                    <p>{student_row['Name']}</p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-                <div class="card">
-                    <h3>📊 GPA</h3>
-                    <p>{gpa_row['GPA']}</p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            rank = gpa_df[gpa_df["IndexNumber"] == index_number].index[0] + 1
-            total_students = len(gpa_df)
-            st.markdown(f"""
-                <div class="card">
-                    <h3>🏆 Rank</h3>
-                    <p>{rank} / {total_students}</p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown('</div>', unsafe_allow_html=True)
-
-            # Grades Table
-            st.write("### 📘 Module Grades")
-            grade_cols = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
-            grades_table = pd.DataFrame({
-                "Module": grade_cols,
-                "Grade": [student_row[col] for col in grade_cols]
-            })
-            st.dataframe(grades_table, use_container_width=True)
+        # Grades Table
+        st.write("### 📘 Module Grades")
+        grades_table = pd.DataFrame({
+            "Module": grade_cols,
+            "Grade": [student_row[col] for col in grade_cols]
+        })
+        st.dataframe(grades_table, use_container_width=True)
 
     # -----------------------------
     if __name__ == "__main__":
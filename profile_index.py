@@ -0,0 +1,52 @@
+# profile_index.py
+# Per-student lookup and rank index for the Personalized Profile.
+# Built once when the combined results and GPA tables are loaded, so each
+# profile view is a dictionary lookup instead of boolean scans over both
+# tables, and ranks do not depend on the order of the uploaded CSV.
+import pandas as pd
+
+from gpa_index import GPAIndex
+from grades import as_grade_columns
+from index_numbers import normalize_index_numbers
+
+
+def competition_rank(gpa):
+    """Standard competition ranking (1, 2, 2, 4) with the highest GPA first."""
+    return pd.Series(gpa).rank(method="min", ascending=False).astype("Int64")
+
+
+def position_index(index_numbers):
+    """IndexNumber -> row position; the first row wins for duplicate numbers."""
+    positions = {}
+    for position, key in enumerate(normalize_index_numbers(index_numbers).tolist()):
+        if not pd.isna(key):
+            positions.setdefault(key, position)
+    return positions
+
+
+class ProfileIndex:
+    """Combined results and GPA tables indexed by IndexNumber, with a Rank column."""
+
+    def __init__(self, combined_df, gpa_df):
+        # Module columns are kept as compact categorical grades
+        self.combined_df = as_grade_columns(combined_df)
+        self.gpa_df = gpa_df.assign(Rank=competition_rank(gpa_df["GPA"]).values)
+        self.grade_cols = [col for col in combined_df.columns if col not in ["IndexNumber", "Name"]]
+        self.total_students = len(gpa_df)
+        # Sorted GPAs for percentile, range and top-k questions
+        self.gpa_index = GPAIndex.from_frame(gpa_df)
+        self._combined_pos = position_index(combined_df["IndexNumber"])
+        self._gpa_pos = position_index(gpa_df["IndexNumber"])
+
+    def __contains__(self, index_number):
+        return str(index_number).strip() in self._combined_pos
+
+    def lookup(self, index_number):
+        """Return (student_row, gpa_row) or None; gpa_row is None if the student has no GPA."""
+        key = str(index_number).strip()
+        if key not in self._combined_pos:
+            return None
+        student_row = self.combined_df.iloc[self._combined_pos[key]]
+        gpa_pos = self._gpa_pos.get(key)
+        gpa_row = self.gpa_df.iloc[gpa_pos] if gpa_pos is not None else None
+        return student_row, gpa_row
@@ -0,0 +1,249 @@
+# profile_reports.py
+# Bulk Personalized Profile reports for a whole cohort.
+# Renders the profile cards (Name, GPA, Rank, Percentile) and the module grades
+# table for every student to HTML or PDF. Students are split into chunks that
+# a process pool renders in parallel; the page templates are compiled once
+# per process. Output goes to a zip file or a directory:
+#
+#   python profile_reports.py --combined combined_results.csv --gpa gpa_results.csv --out reports.zip
+#   python profile_reports.py --cohort 2024-S1 --format pdf --out reports/
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html import escape
+from string import Template
+
+import pandas as pd
+
+from index_numbers import normalize_index_numbers
+from profile_index import ProfileIndex
+
+REPORT_FORMATS = ("html", "pdf")
+REPORT_WORKERS = int(os.environ.get("RESULTPY_REPORT_WORKERS", os.cpu_count() or 1))
+# Students rendered per pool task
+CHUNK_SIZE = 250
+# Pools start from Streamlit and report job threads; a forked child can inherit a
+# lock another thread holds and hang, so workers come from a fork server
+POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Academic Profile - $name</title>
+<style>
+body { font-family: sans-serif; color: #333; margin: 32px; }
+.cards { width: 100%; border-spacing: 12px; }
+.card { background: #f7f7f7; border-radius: 12px; padding: 16px; text-align: center; }
+.card h3 { margin: 0; font-size: 16px; }
+.card p { margin: 8px 0 0; font-size: 18px; font-weight: bold; color: #555; }
+.grades { border-collapse: collapse; width: 100%; margin-top: 20px; }
+.grades th, .grades td { border: 1px solid #ddd; padding: 6px 10px; text-align: left; }
+.grades th { background: #eee; }
+</style>
+</head>
+<body>
+<h1>Personalized Academic Profile</h1>
+<p>Index Number: $index_number</p>
+<table class="cards"><tr>
+<td class="card"><h3>Name</h3><p>$name</p></td>
+<td class="card"><h3>GPA</h3><p>$gpa</p></td>
+<td class="card"><h3>Rank</h3><p>$rank / $total_students</p></td>
+<td class="card"><h3>Percentile</h3><p>$percentile</p></td>
+</tr></table>
+<h2>Module Grades</h2>
+<table class="grades">
+<tr><th>Module</th><th>Grade</th></tr>
+$rows
+</table>
+</body>
+</html>
+""")
+ROW = Template("<tr><td>$module</td><td>$grade</td></tr>")
+
+
+def _text(value):
+    return "-" if value is None or pd.isna(value) else escape(str(value))
+
+
+def report_filename(index_number, fmt):
+    return f"{re.sub(r'[^0-9A-Za-z._-]+', '_', index_number).strip('_') or 'student'}.{fmt}"
+
+
+def report_records(profile_index):
+    """One (IndexNumber, Name, GPA, Rank, Percentile, grades) tuple per student.
+
+    Students follow the combined results order; the first row wins for
+    duplicate index numbers, as in the profile lookup.
+    """
+    combined_df, gpa_df = profile_index.combined_df, profile_index.gpa_df
+    keys = normalize_index_numbers(combined_df["IndexNumber"])
+    first = keys.notna().to_numpy() & ~keys.duplicated().to_numpy()
+
+    gpa_keys = normalize_index_numbers(gpa_df["IndexNumber"])
+    gpa_rows = gpa_df.set_axis(gpa_keys.to_numpy())[~gpa_keys.duplicated().to_numpy()]
+    gpa_rows = gpa_rows.reindex(keys[first].to_numpy())
+
+    gpa_index = profile_index.gpa_index
+    grades = combined_df.loc[first, profile_index.grade_cols].astype(object)
+    records = []
+    for key, name, gpa, rank, row in zip(keys[first], combined_df["Name"][first],
+                                          gpa_rows["GPA"], gpa_rows["Rank"], grades.itertuples(index=False)):
+        percentile = f"{gpa_index.percentile(gpa):.1f}" if pd.notna(gpa) else None
+        records.append((key, name, gpa, rank, percentile, tuple(row)))
+    return records
+
+
+def render_html(record, grade_cols, total_students):
+    index_number, name, gpa, rank, percentile, grades = record
+    return PAGE.substitute(
+        index_number=_text(index_number), name=_text(name), gpa=_text(gpa),
+        rank=_text(rank), total_students=total_students, percentile=_text(percentile),
+        rows="\n".join(ROW.substitute(module=_text(module), grade=_text(grade))
+                       for module, grade in zip(grade_cols, grades)),
+    )
+
+
+def render_pdf(html):
+    """A4 PDF of a report page, laid out by PyMuPDF's HTML story."""
+    import fitz  # PyMuPDF; only needed for PDF reports
+
+    buffer = io.BytesIO()
+    writer = fitz.DocumentWriter(buffer)
+    story = fitz.Story(html=html)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (36, 36, -36, -36)
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    return buffer.getvalue()
+
+
+def render_chunk(records, grade_cols, total_students, fmt, out_dir=None):
+    """Render a chunk of students; returns [(filename, content)], or the count when writing to out_dir."""
+    rendered = []
+    for record in records:
+        page = render_html(record, grade_cols, total_students)
+        content = render_pdf(page) if fmt == "pdf" else page.encode("utf-8")
+        rendered.append((report_filename(record[0], fmt), content))
+    if out_dir is None:
+        return rendered
+    for filename, content in rendered:
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(content)
+    return len(rendered)
+
+
+def generate_reports(profile_index, out, fmt="html", workers=None, progress=None):
+    """Render every student's report into `out` and return the number written.
+
+    `out` is a directory path, a path ending in .zip, or a writable binary
+    file object that receives a zip. Chunks are rendered by a process pool
+    (serially for workers <= 1 or if the pool cannot start).
+    `progress(fraction, text)` is called as each chunk finishes.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"fmt must be one of {REPORT_FORMATS}")
+    workers = REPORT_WORKERS if workers is None else workers
+    records = report_records(profile_index)
+    chunks = [records[i:i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)]
+    to_zip = not isinstance(out, str) or out.endswith(".zip")
+    out_dir = None
+    if not to_zip:
+        out_dir = out
+        os.makedirs(out_dir, exist_ok=True)
+    args = (profile_index.grade_cols, profile_index.total_students, fmt, out_dir)
+
+    def finished(results):
+        # Yields each chunk's result while reporting progress
+        for done, result in enumerate(results, start=1):
+            if progress is not None:
+                progress(done / len(chunks), f"{min(done * CHUNK_SIZE, len(records))} of {len(records)} reports")
+            yield result
+
+    def write(results):
+        if not to_zip:
+            return sum(finished(results))
+        written = 0
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for rendered in finished(results):
+                for filename, content in rendered:
+                    archive.writestr(filename, content)
+                written += len(rendered)
+        return written
+
+    if workers > 1 and len(chunks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=POOL_CONTEXT) as pool:
+                return write(pool.map(render_chunk, chunks, *[[arg] * len(chunks) for arg in args]))
+        except (BrokenProcessPool, OSError):
+            if not isinstance(out, str):
+                out.seek(0)
+                out.truncate()
+    return write(render_chunk(chunk, *args) for chunk in chunks)
+
+
+def report_file(profile_index, path, fmt="html", workers=None, progress=None):
+    """Zip all reports to `path`, written beside it and renamed into place; returns the path."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part.zip"
+    try:
+        generate_reports(profile_index, tmp_path, fmt, workers, progress)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+# -----------------------------
+# Command line
+def load_profile_index(combined_path=None, gpa_path=None, cohort_id=None):
+    if cohort_id is not None:
+        from results_store import ResultsStore
+
+        store = ResultsStore()
+        if cohort_id not in store.list_cohorts():
+            raise ValueError(f"no published cohort {cohort_id!r}")
+        return ProfileIndex(*store.cohort(cohort_id))
+    return ProfileIndex(pd.read_csv(combined_path), pd.read_csv(gpa_path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a profile report for every student in a cohort.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--combined", help="combined results CSV (use with --gpa)")
+    source.add_argument("--cohort", help="cohort ID published to the results store")
+    parser.add_argument("--gpa", help="GPA results CSV")
+    parser.add_argument("--out", required=True, help="output directory, or a .zip file")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="html")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render processes (default: RESULTPY_REPORT_WORKERS or CPU count)")
+    args = parser.parse_args(argv)
+    if args.combined and not args.gpa:
+        parser.error("--combined needs --gpa")
+
+    try:
+        profile_index = load_profile_index(args.combined, args.gpa, args.cohort)
+        written = generate_reports(profile_index, args.out, args.format, args.workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Wrote {written} {args.format.upper()} reports to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,30 @@
 import streamlit as st
 import pandas as pd
-import fitz  # PyMuPDF
-import re
 
-def app():
-    def extract_results(pdf_file, index_df):
-        # Read PDF content
-        doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-        pdf_text = ""
-        for page in doc:
-            pdf_text += page.get_text()
+from choices import ENGINE_CHOICES
+from extraction import VIEW_GRADES_PATTERN, build_name_index, extract_matches, join_names
+from jobs import JOBS, wait
+from perf_panel import profiled
+from uploads import spool_upload
 
-        # Extract index numbers and grades
-        results_pattern = r"([A-Za-z0-9]+)\s+(A\+|A\-|A|B\+|B\-|B|C\+|C\-|C|D|I)"
-        matches = re.findall(results_pattern, pdf_text)
+def app():
+    def extract_results(pdf_file, name_index, engine):
+        # Extract index numbers and grades (cached by PDF content) in a background
+        # job; a rerun mid-parse waits on the same job instead of starting again.
+        # The upload is spooled to disk once and parsed by path, not copied per rerun
+        pdf = spool_upload(pdf_file)
+        job = JOBS.submit(("view_grades", pdf.digest, engine),
+                          extract_matches, pdf, VIEW_GRADES_PATTERN, engine=engine)
+        matches = wait(job, st.progress(0.0, text="Processing results..."))
 
         if not matches:
             st.error("No results found in the PDF. Check the format and regex pattern.")
             return pd.DataFrame()
 
-        # Custom grade sorting order
-        grade_order = {
-            "A+": 1, "A": 2, "A-": 3,
-            "B+": 4, "B": 5, "B-": 6,
-            "C+": 7, "C": 8, "C-": 9,
-            "D": 10, "I": 11
-        }
-
-        # Map results to names
-        results = []
-        for index, grade in matches:
-            name = index_df.loc[index_df['IndexNumber'] == index, 'Name'].values
-            if len(name) == 0:
-                continue  # skip unknown indices
-            results.append({"Name": name[0], "Result": grade})
-
-        # Build DataFrame
-        results_df = pd.DataFrame(results)
+        # Map results to names and apply custom grade sort
+        results_df = join_names(matches, name_index)
         if results_df.empty:
             st.warning("No valid results matched the index numbers in the database.")
-            return results_df
-
-        # Apply custom grade sort
-        results_df["GradeOrder"] = results_df["Result"].map(grade_order)
-        results_df = results_df.sort_values(by="GradeOrder").drop(columns=["GradeOrder"])
         return results_df
 
     # --- Streamlit UI ---
@@ -56,12 +37,14 @@ def app():
         index_df = pd.read_csv(index_file)
         st.write("Pre-fed data:")
         st.dataframe(index_df)
+        name_index = build_name_index(index_df)
 
         # Upload PDF file
         pdf_file = st.file_uploader("Upload Results PDF", type="pdf")
+        engine = st.radio("Read results by", list(ENGINE_CHOICES), horizontal=True)
         if pdf_file is not None:
-            st.write("Processing results...")
-            results_df = extract_results(pdf_file, index_df)
+            with profiled("View Grades"):
+                results_df = extract_results(pdf_file, name_index, ENGINE_CHOICES[engine])
             if not results_df.empty:
                 st.write("Results (sorted in descending order):")
                 st.dataframe(results_df)
@@ -0,0 +1,198 @@
+# results_store.py
+# Persistent cohort results store for the Profile and Chatbot pages.
+# The GPA Calculator publishes a cohort once; the other pages open it by
+# cohort ID and read one student's rows through an index on IndexNumber,
+# instead of every student re-uploading and re-parsing both CSVs.
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from index_numbers import normalize_index_numbers
+from instrumentation import stage
+from profile_index import competition_rank
+
+STORE_PATH = os.environ.get("RESULTPY_STORE", "results_store.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cohorts (
+    cohort_id    TEXT PRIMARY KEY,
+    modules      TEXT NOT NULL,
+    credits      TEXT NOT NULL,
+    students     INTEGER NOT NULL,
+    published_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS students (
+    cohort_id   TEXT NOT NULL,
+    IndexNumber TEXT NOT NULL,
+    Name        TEXT,
+    GPA         REAL,
+    Position    INTEGER,
+    Rank        INTEGER,
+    PRIMARY KEY (cohort_id, IndexNumber)
+);
+CREATE TABLE IF NOT EXISTS grades (
+    cohort_id   TEXT NOT NULL,
+    IndexNumber TEXT NOT NULL,
+    Module      TEXT NOT NULL,
+    Grade       TEXT,
+    PRIMARY KEY (cohort_id, IndexNumber, Module)
+);
+CREATE INDEX IF NOT EXISTS students_position ON students (cohort_id, Position);
+"""
+
+
+class ResultsStore:
+    """SQLite-backed store of published cohorts (combined results + GPA leaderboard)."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call; Streamlit serves sessions from many threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -----------------------------
+    # Publishing
+    def publish(self, cohort_id, all_results, gpa_df, module_credits=None):
+        """Replace cohort_id with this combined results table and GPA leaderboard."""
+        modules = [col for col in all_results.columns if col not in ["IndexNumber", "Name"]]
+        credits = {m: float(c) for m, c in (module_credits or {}).items()}
+
+        results_keys = normalize_index_numbers(all_results["IndexNumber"]).tolist()
+        gpa_keys = normalize_index_numbers(gpa_df["IndexNumber"]).tolist()
+        ranks = competition_rank(gpa_df["GPA"]).tolist()
+        gpa_by_key = {}
+        for position, (key, gpa, rank) in enumerate(zip(gpa_keys, gpa_df["GPA"].tolist(), ranks), start=1):
+            gpa_by_key.setdefault(key, (gpa, position, _value(rank)))
+
+        student_rows = {}
+        for key, name in zip(results_keys, all_results["Name"].tolist()):
+            if pd.isna(key) or key in student_rows:
+                continue
+            gpa, position, rank = gpa_by_key.get(key, (None, None, None))
+            student_rows[key] = (cohort_id, key, _value(name), _value(gpa), position, rank)
+
+        grade_rows = {}
+        for module in modules:
+            for key, grade in zip(results_keys, all_results[module].tolist()):
+                if not pd.isna(key):
+                    grade_rows.setdefault((key, module), (cohort_id, key, module, _value(grade)))
+
+        with stage("publish", students=len(student_rows), grades=len(grade_rows)), self._connect() as conn:
+            conn.execute("DELETE FROM grades WHERE cohort_id = ?", (cohort_id,))
+            conn.execute("DELETE FROM students WHERE cohort_id = ?", (cohort_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO cohorts VALUES (?, ?, ?, ?, ?)",
+                (cohort_id, json.dumps(modules), json.dumps(credits), len(student_rows), time.time()),
+            )
+            conn.executemany("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?)", student_rows.values())
+            conn.executemany("INSERT INTO grades VALUES (?, ?, ?, ?)", grade_rows.values())
+
+    # -----------------------------
+    # Reading
+    def list_cohorts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT cohort_id FROM cohorts ORDER BY published_at DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def modules(self, cohort_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT modules FROM cohorts WHERE cohort_id = ?", (cohort_id,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def count(self, cohort_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT students FROM cohorts WHERE cohort_id = ?", (cohort_id,)).fetchone()
+        return row[0] if row else 0
+
+    def student(self, cohort_id, index_number):
+        """Return (student_row, gpa_row) for one student, or None if not in the cohort.
+
+        student_row holds IndexNumber, Name and one entry per module in
+        published order; gpa_row holds IndexNumber, Name, GPA, Position (row
+        in the published leaderboard, 1-based) and competition Rank.
+        """
+        key = str(index_number).strip()
+        with self._connect() as conn:
+            found = conn.execute(
+                "SELECT Name, GPA, Position, Rank FROM students WHERE cohort_id = ? AND IndexNumber = ?",
+                (cohort_id, key),
+            ).fetchone()
+            if found is None:
+                return None
+            grades = dict(conn.execute(
+                "SELECT Module, Grade FROM grades WHERE cohort_id = ? AND IndexNumber = ?",
+                (cohort_id, key),
+            ).fetchall())
+
+        name, gpa, position, rank = found
+        student_row = pd.Series({"IndexNumber": key, "Name": name,
+                                 **{m: grades.get(m) for m in self.modules(cohort_id)}})
+        gpa_row = pd.Series({"IndexNumber": key, "Name": name, "GPA": gpa,
+                             "Position": position, "Rank": rank})
+        return student_row, gpa_row
+
+    def published_at(self, cohort_id):
+        """Publish time of a cohort; changes whenever it is republished."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT published_at FROM cohorts WHERE cohort_id = ?", (cohort_id,)).fetchone()
+        return row[0] if row else None
+
+    def leaderboard(self, cohort_id):
+        """IndexNumber, Name and GPA of every student with a GPA, in published order."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT IndexNumber, Name, GPA FROM students "
+                "WHERE cohort_id = ? AND Position IS NOT NULL ORDER BY Position",
+                (cohort_id,),
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["IndexNumber", "Name", "GPA"])
+
+    def cohort(self, cohort_id):
+        """Whole cohort as (all_results, gpa_df) in published order, for bulk jobs."""
+        modules = self.modules(cohort_id)
+        with self._connect() as conn:
+            students = pd.read_sql_query(
+                "SELECT IndexNumber, Name, GPA, Position FROM students WHERE cohort_id = ? ORDER BY rowid",
+                conn, params=(cohort_id,),
+            )
+            grades = pd.read_sql_query(
+                "SELECT IndexNumber, Module, Grade FROM grades WHERE cohort_id = ?",
+                conn, params=(cohort_id,),
+            )
+        wide = (grades.pivot(index="IndexNumber", columns="Module", values="Grade")
+                .reindex(index=students["IndexNumber"], columns=modules))
+        all_results = pd.concat([students[["IndexNumber", "Name"]], wide.reset_index(drop=True)], axis=1)
+        gpa_df = (students.dropna(subset=["Position"]).sort_values("Position")
+                  [["IndexNumber", "Name", "GPA"]].reset_index(drop=True))
+        return all_results, gpa_df
+
+    def top(self, cohort_id, n=1):
+        """First n rows of the published leaderboard."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT IndexNumber, Name, GPA, Position FROM students "
+                "WHERE cohort_id = ? AND Position IS NOT NULL ORDER BY Position LIMIT ?",
+                (cohort_id, n),
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["IndexNumber", "Name", "GPA", "Position"])
+
+
+def _value(value):
+    # SQLite cannot bind NaN/NA or NumPy scalars
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
@@ -0,0 +1,113 @@
+# sharded_extraction.py
+# Page-sharded parallel text extraction for very large result books.
+# Each worker opens the document from the shared PDF (bytes, or the path of a
+# spooled upload), extracts a range
+# of pages and runs the grade regex locally. Matches are merged in page order
+# and the text around each shard seam is re-scanned, so the output is the
+# same as running the regex over the whole document text.
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from uploads import open_pdf
+
+# Books with fewer pages than this are not worth the pool start-up cost
+SHARD_MIN_PAGES = 64
+# Matches this close to a shard edge may change when the text is joined
+SEAM_CHARS = 1024
+# Pools start from Streamlit and job threads; a forked child can inherit a
+# lock another thread holds and hang, so workers come from a fork server
+POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+_worker_pdf_bytes = None
+
+
+class SeamMismatch(Exception):
+    """Raised when a shard seam cannot be stitched to match a whole-text scan."""
+
+
+def _init_worker(pdf_bytes):
+    # Runs once per worker process, so the PDF is shipped once per worker
+    # (a SpooledPDF ships only its path)
+    global _worker_pdf_bytes
+    _worker_pdf_bytes = pdf_bytes
+
+
+def page_ranges(page_count, shards):
+    """Split page_count pages into at most `shards` contiguous (start, stop) ranges."""
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges, start = [], 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def scan_shard(page_range, pattern, pdf_bytes=None):
+    """Extract one page range and scan it.
+
+    Returns (head, interior, tail, anchor_len). `interior` holds the matches
+    that cannot be affected by neighbouring shards; the first one is the
+    anchor, which also ends `head`. A shard without safe matches returns its
+    whole text as `head` and anchor_len 0.
+    """
+    doc = open_pdf(pdf_bytes if pdf_bytes is not None else _worker_pdf_bytes)
+    start, stop = page_range
+    text = "".join(doc[i].get_text("text") for i in range(start, stop))
+    doc.close()
+
+    regex = re.compile(pattern)
+    safe = [m for m in regex.finditer(text)
+            if m.start() >= SEAM_CHARS and m.end() <= len(text) - SEAM_CHARS]
+    if not safe:
+        return text, [], "", 0
+
+    first, last = safe[0], safe[-1]
+    return (
+        text[:first.end()],
+        [m.groups() for m in safe],
+        text[last.end():],
+        first.end() - first.start(),
+    )
+
+
+def merge_shards(shards, pattern):
+    """Stitch per-shard scans back together in page order."""
+    regex = re.compile(pattern)
+    matches = []
+    carry = ""
+    for head, interior, tail, anchor_len in shards:
+        if not anchor_len:
+            carry += head
+            continue
+        region = carry + head
+        found = list(regex.finditer(region))
+        # The whole-text scan must land exactly on this shard's anchor match
+        if not found or found[-1].span() != (len(region) - anchor_len, len(region)):
+            raise SeamMismatch()
+        matches.extend(m.groups() for m in found[:-1])
+        matches.extend(interior)
+        carry = tail
+    matches.extend(regex.findall(carry))
+    return matches
+
+
+def parse_matches_sharded(pdf_bytes, pattern, workers, page_count, progress=None):
+    """Scan a large PDF with `workers` processes, one page range each.
+
+    `progress(fraction, text)` is called as each page range finishes.
+    """
+    ranges = page_ranges(page_count, workers)
+
+    shards = []
+    with ProcessPoolExecutor(
+        max_workers=len(ranges), mp_context=POOL_CONTEXT, initializer=_init_worker, initargs=(pdf_bytes,)
+    ) as pool:
+        for (first, last), shard in zip(ranges, pool.map(scan_shard, ranges, [pattern] * len(ranges))):
+            shards.append(shard)
+            if progress is not None:
+                progress(len(shards) / len(ranges), f"Pages {first + 1}-{last} of {page_count}")
+    return merge_shards(shards, pattern)
@@ -0,0 +1,182 @@
+# test_extraction.py
+# Seam handling of the page-by-page and page-sharded extraction paths.
+# Every path must return exactly the matches of one regex scan over the whole
+# document text, including matches that straddle a page or shard boundary.
+# Also the duplicate rules of combine_results.
+#
+#   python -m pytest -q
+import random
+import re
+
+import fitz  # PyMuPDF
+import pandas as pd
+import pytest
+
+import extraction
+from extraction import MODULE_RESULTS_PATTERN, VIEW_GRADES_PATTERN, combine_results, iter_matches, parse_matches
+from sharded_extraction import SHARD_MIN_PAGES, SeamMismatch, merge_shards, page_ranges, scan_shard
+
+PATTERNS = [VIEW_GRADES_PATTERN, MODULE_RESULTS_PATTERN]
+GRADES = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D", "I"]
+
+
+def results_book(pages, rows_per_page=40, seed=0):
+    """A multi-page results PDF whose last row on each page has its grade on the next page."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    number = 210000
+    pending_grade = None
+    for page_no in range(pages):
+        page = doc.new_page(width=595, height=842)
+        lines = []
+        if pending_grade is not None:
+            lines.append(pending_grade)
+        for _ in range(rows_per_page):
+            number += 1
+            lines.append(f"{number}{chr(65 + rng.randrange(26))} {rng.choice(GRADES)}")
+        if page_no < pages - 1:
+            # Split the last row: index number here, grade at the top of the next page
+            number += 1
+            lines.append(f"{number}{chr(65 + rng.randrange(26))}")
+            pending_grade = rng.choice(GRADES)
+        for i, line in enumerate(lines):
+            page.insert_text((72, 60 + i * 17), line, fontsize=10)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def whole_text_matches(pdf_bytes, pattern):
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        text = "".join(page.get_text("text") for page in doc)
+    return re.findall(pattern, text)
+
+
+@pytest.fixture(scope="module")
+def book():
+    return results_book(SHARD_MIN_PAGES + 16)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_iter_matches_equals_whole_text_scan(book, pattern):
+    expected = whole_text_matches(book, pattern)
+    assert [(index, grade) for index, grade, _ in iter_matches(book, pattern)] == expected
+    assert parse_matches(book, pattern) == expected
+
+
+def test_iter_matches_keeps_matches_split_across_pages(book):
+    with fitz.open(stream=book, filetype="pdf") as doc:
+        first_page_lines = doc[0].get_text("text").splitlines()
+    split_index = first_page_lines[-1]
+    found = [(grade, page_no) for index, grade, page_no in iter_matches(book, VIEW_GRADES_PATTERN)
+             if index == split_index]
+    # Matched once, on the page where it starts
+    assert len(found) == 1 and found[0][1] == 1
+
+
+class TextPages(list):
+    """Stands in for a fitz document whose pages hold the given text."""
+
+    page_count = property(len)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TextPage:
+    def __init__(self, text):
+        self.text = text
+
+    def get_text(self, _):
+        return self.text
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_iter_matches_random_page_splits(pattern, monkeypatch):
+    # Short random pages of grade-like text put every kind of token on a page edge
+    monkeypatch.setattr(extraction, "open_pdf", lambda pages: TextPages(TextPage(text) for text in pages))
+    rng = random.Random(0)
+    for _ in range(5000):
+        pages = ["".join(rng.choice("AB+-I 1|\n.xC") for _ in range(rng.randrange(12)))
+                 for _ in range(rng.randrange(1, 6))]
+        found = [(index, grade) for index, grade, _ in iter_matches(pages, pattern)]
+        assert found == re.findall(pattern, "".join(pages)), pages
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+@pytest.mark.parametrize("shards", [2, 3, 7])
+def test_merge_shards_equals_whole_text_scan(book, pattern, shards):
+    with fitz.open(stream=book, filetype="pdf") as doc:
+        ranges = page_ranges(doc.page_count, shards)
+    scanned = [scan_shard(page_range, pattern, book) for page_range in ranges]
+    # Every seam falls on a page boundary with a split row across it
+    assert all(anchor_len for *_, anchor_len in scanned)
+    assert merge_shards(scanned, pattern) == whole_text_matches(book, pattern)
+
+
+def test_merge_shards_carries_shards_without_safe_matches(book):
+    # One page per shard is shorter than the seam margins, so no shard has an anchor
+    with fitz.open(stream=book, filetype="pdf") as doc:
+        ranges = page_ranges(doc.page_count, doc.page_count)
+    scanned = [scan_shard(page_range, VIEW_GRADES_PATTERN, book) for page_range in ranges]
+    assert not any(anchor_len for *_, anchor_len in scanned)
+    assert merge_shards(scanned, VIEW_GRADES_PATTERN) == whole_text_matches(book, VIEW_GRADES_PATTERN)
+
+
+def test_merge_shards_rejects_a_seam_that_moves_the_anchor():
+    # Joined to the text before it, the second shard's anchor "1A B+" becomes
+    # "211A B+", so the shard's interior matches can no longer be trusted
+    shards = [("21", [], "", 0), ("1A B+", [("9Z", "C")], "", len("1A B+"))]
+    with pytest.raises(SeamMismatch):
+        merge_shards(shards, VIEW_GRADES_PATTERN)
+
+
+def test_parse_matches_sharded_equals_serial(book):
+    assert parse_matches(book, VIEW_GRADES_PATTERN, workers=2) == whole_text_matches(book, VIEW_GRADES_PATTERN)
+
+
+def test_parse_matches_falls_back_to_serial_on_seam_mismatch(book, monkeypatch):
+    def mismatched(*args, **kwargs):
+        raise SeamMismatch()
+
+    monkeypatch.setattr(extraction, "parse_matches_sharded", mismatched)
+    assert parse_matches(book, VIEW_GRADES_PATTERN, workers=4) == whole_text_matches(book, VIEW_GRADES_PATTERN)
+
+
+# -----------------------------
+# combine_results duplicate rules
+RETAKES = [
+    ("210001A", "C"), ("210002B", "B+"), ("210001A", "A-"),
+    ("210003C", "I"), ("210001A", "B"), ("210003C", "B-"),
+]
+
+
+@pytest.mark.parametrize("rule, expected", [
+    ("last", ["B", "B+", "B-", None]),
+    ("first", ["C", "B+", "I", None]),
+    ("best", ["A-", "B+", "B-", None]),
+])
+def test_combine_results_duplicate_rules(rule, expected):
+    index_df = pd.DataFrame({"IndexNumber": ["210001A", "210002B", "210003C", "210004D"], "Name": list("WXYZ")})
+    all_results, _ = combine_results(index_df, [("CS1010", iter(RETAKES)), ("MA1001", [("210004D", "A")])], rule)
+    assert list(all_results.columns) == ["IndexNumber", "Name", "CS1010", "MA1001"]
+    assert all_results["CS1010"].astype(object).where(all_results["CS1010"].notna(), None).tolist() == expected
+    assert all_results["MA1001"].isna().tolist() == [True, True, True, False]
+
+
+def test_combine_results_reports_duplicates():
+    index_df = pd.DataFrame({"IndexNumber": ["210001A", "210002B", "210003C"], "Name": list("XYZ")})
+    _, duplicates_df = combine_results(index_df, [("CS1010", RETAKES), ("MA1001", [("210002B", "A"), ("210002B", "A")])])
+    assert duplicates_df.to_dict("records") == [
+        {"IndexNumber": "210001A", "Module": "CS1010", "Occurrences": 3, "Grades": "C, A-, B"},
+        {"IndexNumber": "210003C", "Module": "CS1010", "Occurrences": 2, "Grades": "I, B-"},
+        {"IndexNumber": "210002B", "Module": "MA1001", "Occurrences": 2, "Grades": "A, A"},
+    ]
+
+
+def test_combine_results_rejects_unknown_rule():
+    with pytest.raises(ValueError):
+        combine_results(pd.DataFrame({"IndexNumber": [], "Name": []}), [], "worst")
@@ -0,0 +1,186 @@
+# test_gpa_engine.py
+# The vectorized GPA engine and the incremental cohort against the per-row
+# loop the GPA Calculator used to run, on random cohorts. GPAs are compared
+# with exact half-up rounding; the old float loop may differ by 0.01.
+#
+#   python -m pytest -q
+import random
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+from extraction import combine_results
+from gpa_engine import GRADE_POINTS, compute_gpa, gpa_from_totals
+from incremental import IncrementalCohort
+
+GRADES = list(GRADE_POINTS)
+CREDITS = [0.5, 1, 1.5, 2, 3, 4]
+
+
+def reference_gpa(all_results, module_credits):
+    """The per-row loop, with exact sums and half-up rounding to 2 decimals."""
+    gpas = {}
+    for _, row in all_results.iterrows():
+        total_weighted, total_credits = Fraction(0), Fraction(0)
+        for module_name, credit in module_credits.items():
+            grade = row.get(module_name, None)
+            if grade in GRADE_POINTS:
+                total_weighted += Fraction(str(GRADE_POINTS[grade])) * Fraction(str(credit))
+                total_credits += Fraction(str(credit))
+        gpa = total_weighted / total_credits if total_credits > 0 else Fraction(0)
+        gpas[row["IndexNumber"]] = int(gpa * 100 + Fraction(1, 2)) / 100
+    return gpas
+
+
+def float_loop_gpa(all_results, module_credits):
+    """The per-row loop exactly as the GPA Calculator used to run it."""
+    gpas = {}
+    for _, row in all_results.iterrows():
+        total_weighted, total_credits = 0, 0
+        for module_name, credit in module_credits.items():
+            grade = row.get(module_name, None)
+            if grade in GRADE_POINTS:
+                total_weighted += GRADE_POINTS[grade] * credit
+                total_credits += credit
+        gpa = total_weighted / total_credits if total_credits > 0 else 0
+        gpas[row["IndexNumber"]] = round(gpa, 2)
+    return gpas
+
+
+def random_cohort(rng, students, modules):
+    index_df = pd.DataFrame({
+        "IndexNumber": [f"{210000 + i}{chr(65 + i % 26)}" for i in range(students)],
+        "Name": [f"Student {i}" for i in range(students)],
+    })
+    module_credits = {f"MOD{m}": rng.choice(CREDITS) for m in range(modules)}
+    all_results = index_df.copy()
+    for module in module_credits:
+        # Some students have no grade for a module
+        all_results[module] = [rng.choice(GRADES) if rng.random() < 0.9 else None for _ in range(students)]
+    return all_results, module_credits
+
+
+def random_matches(rng, index_df, repeats=0.05):
+    matches = [(index, rng.choice(GRADES)) for index in index_df["IndexNumber"] if rng.random() < 0.9]
+    matches += [(rng.choice(index_df["IndexNumber"]), rng.choice(GRADES)) for _ in range(int(len(matches) * repeats))]
+    rng.shuffle(matches)
+    return matches
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compute_gpa_matches_reference_loop(seed):
+    rng = random.Random(seed)
+    all_results, module_credits = random_cohort(rng, students=200, modules=rng.randrange(1, 8))
+    gpa_df = compute_gpa(all_results, module_credits)
+
+    assert list(gpa_df.columns) == ["IndexNumber", "Name", "GPA"]
+    assert gpa_df["GPA"].is_monotonic_decreasing
+    assert dict(zip(gpa_df["IndexNumber"], gpa_df["GPA"])) == reference_gpa(all_results, module_credits)
+    # The old float loop agrees to within one rounding step
+    old = float_loop_gpa(all_results, module_credits)
+    assert all(abs(gpa - old[index]) <= 0.01 + 1e-9 for index, gpa in zip(gpa_df["IndexNumber"], gpa_df["GPA"]))
+
+
+@pytest.mark.parametrize("grades, credits, expected", [
+    (["A", "B+"], [1, 3], 3.48),      # 13.9 / 4 = 3.475
+    (["A-", "B"], [1, 3], 3.18),      # 12.7 / 4 = 3.175
+    (["A-", "B+"], [3, 1], 3.6),      # 14.4 / 4
+    (["C-", "B+"], [1, 1], 2.5),      # 5.0 / 2
+    (["B-", "C"], [3, 1], 2.53),      # 10.1 / 4 = 2.525
+    (["I", "C-"], [1, 3], 1.28),      # 5.1 / 4 = 1.275
+])
+def test_compute_gpa_rounds_half_cents_up(grades, credits, expected):
+    module_credits = {f"MOD{i}": credit for i, credit in enumerate(credits)}
+    all_results = pd.DataFrame({"IndexNumber": ["210001A"], "Name": ["A"]})
+    for module, grade in zip(module_credits, grades):
+        all_results[module] = [grade]
+    assert compute_gpa(all_results, module_credits)["GPA"].tolist() == [expected]
+    assert reference_gpa(all_results, module_credits) == {"210001A": expected}
+
+
+def test_compute_gpa_half_cent_cohort():
+    # Credits 1 and 3 put many totals on an exact half cent
+    rng = random.Random(1)
+    all_results, _ = random_cohort(rng, students=500, modules=2)
+    module_credits = {"MOD0": 1, "MOD1": 3}
+    gpa_df = compute_gpa(all_results, module_credits)
+    expected = reference_gpa(all_results, module_credits)
+    assert dict(zip(gpa_df["IndexNumber"], gpa_df["GPA"])) == expected
+
+
+def test_gpa_from_totals_without_credits_is_zero():
+    assert gpa_from_totals(np.array([0, 40_000]), np.array([0, 1_000])).tolist() == [0.0, 4.0]
+    assert gpa_from_totals(139_000, 4_000) == 3.48
+
+
+# -----------------------------
+# IncrementalCohort
+def assert_matches_full_recompute(cohort, module_matches, module_credits, duplicates):
+    modules = list(module_credits)
+    all_results, duplicates_df = combine_results(cohort.index_df, [(m, module_matches[m]) for m in modules], duplicates)
+    pd.testing.assert_frame_equal(cohort.all_results(modules), all_results)
+    pd.testing.assert_frame_equal(cohort.duplicates(modules).reset_index(drop=True),
+                                  duplicates_df.reset_index(drop=True), check_dtype=False)
+    expected = compute_gpa(all_results, module_credits)
+    pd.testing.assert_frame_equal(cohort.leaderboard(), expected)
+
+
+@pytest.mark.parametrize("duplicates", ["last", "first", "best"])
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_cohort_deltas_match_full_recompute(seed, duplicates):
+    rng = random.Random(seed)
+    index_df = pd.DataFrame({
+        "IndexNumber": [f"{210000 + i}{chr(65 + i % 26)}" for i in range(150)],
+        "Name": [f"Student {i}" for i in range(150)],
+    })
+    cohort = IncrementalCohort(index_df, duplicates)
+    module_matches, module_credits = {}, {}
+
+    for step in range(40):
+        action = rng.choice(["set_module", "set_module", "set_credit", "remove_module"])
+        if action == "set_module" or not module_credits:
+            # Adds a module or replaces one with a new PDF
+            name = f"MOD{rng.randrange(6)}"
+            module_matches[name] = random_matches(rng, index_df)
+            module_credits[name] = rng.choice(CREDITS)
+            cohort.set_module(name, iter(module_matches[name]), module_credits[name])
+        elif action == "set_credit":
+            name = rng.choice(list(module_credits))
+            module_credits[name] = rng.choice(CREDITS)
+            cohort.set_credit(name, module_credits[name])
+        else:
+            name = rng.choice(list(module_credits))
+            del module_credits[name], module_matches[name]
+            cohort.remove_module(name)
+
+        assert sorted(cohort.modules) == sorted(module_credits), step
+        assert_matches_full_recompute(cohort, module_matches, module_credits, duplicates)
+
+    # Removing every module leaves the totals at exactly zero
+    for name in list(module_credits):
+        cohort.remove_module(name)
+    assert not cohort.weighted.any() and not cohort.total_credits.any()
+
+
+def test_incremental_cohort_sync_uses_parsed_matches(monkeypatch):
+    rng = random.Random(0)
+    index_df = pd.DataFrame({"IndexNumber": [f"{210000 + i}A" for i in range(50)], "Name": ["x"] * 50})
+    books = {name: random_matches(rng, index_df) for name in ("MOD0", "MOD1")}
+    cohort = IncrementalCohort(index_df)
+    modules = [("MOD0", 3, b"pdf 0", "regex"), ("MOD1", 1, b"pdf 1", "layout")]
+
+    def extract_modules(*args, **kwargs):
+        raise AssertionError("sync parsed a PDF it was given matches for")
+
+    monkeypatch.setattr(incremental, "extract_modules", extract_modules)
+    assert cohort.stale(modules) == modules
+    assert cohort.sync(modules, None, parsed=[books["MOD0"], books["MOD1"]]) == ["MOD0", "MOD1"]
+    # Only the replaced PDF is stale; a changed credit is applied without parsing
+    modules = [("MOD0", 2, b"pdf 0", "regex"), ("MOD1", 1, b"pdf 1b", "layout")]
+    assert cohort.stale(modules) == modules[1:]
+    assert cohort.sync(modules, None, parsed=[books["MOD1"]]) == ["MOD1"]
+    assert cohort.stale(modules) == []
+    assert_matches_full_recompute(cohort, books, {"MOD0": 2, "MOD1": 1}, "last")
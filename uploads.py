@@ -0,0 +1,182 @@
+# uploads.py
+# Content-addressed spooling of uploaded result PDFs.
+# Each upload is hashed straight from the uploader's buffer and written once
+# to <spool dir>/<sha256>.pdf. Parsing then opens the file by path, so
+# PyMuPDF reads pages from disk (the OS page cache is the one shared copy)
+# instead of every rerun, job and worker process holding its own bytes
+# object. Process pool workers receive the path, not the PDF.
+# Uploads hold student results, so the spool directory is private to the
+# server's user: a fresh mkdtemp() directory per process unless
+# RESULTPY_SPOOL_DIR names one, which must be owned by that user with mode
+# 0700. A spooled file is reused only after its size and hash are checked.
+import atexit
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+# None: a private temporary directory, removed when the process exits
+SPOOL_DIR = os.environ.get("RESULTPY_SPOOL_DIR")
+# Oldest spooled PDFs are deleted once the directory grows past this
+SPOOL_MAX_BYTES = int(os.environ.get("RESULTPY_SPOOL_MAX_BYTES", 2 * 1024 ** 3))
+# Hashing chunk; the upload buffer is sliced, never copied whole
+HASH_CHUNK = 8 * 1024 * 1024
+
+
+class SpooledPDF:
+    """A PDF spooled to disk under its SHA-256; cheap to pickle and to pass around."""
+
+    def __init__(self, path, digest, size):
+        self.path = path
+        self.digest = digest
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"SpooledPDF({self.digest[:12]}, {self.size} bytes)"
+
+    def read(self):
+        """The whole PDF as bytes, for callers that really need a copy."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def file_digest(path):
+    """SHA-256 and size of a file on disk, read in HASH_CHUNK pieces."""
+    sha = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            sha.update(chunk)
+            size += len(chunk)
+    return sha.hexdigest(), size
+
+
+def private_dir(path):
+    """Create `path` with mode 0700, or check an existing one is ours and not shared."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Spool path {path} is not a directory")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Spool directory {path} is owned by another user")
+    if info.st_mode & 0o077:
+        raise PermissionError(f"Spool directory {path} is accessible to other users; chmod 700 it")
+    return path
+
+
+def open_pdf(pdf):
+    """fitz document for a SpooledPDF (opened by path) or raw PDF bytes."""
+    if isinstance(pdf, SpooledPDF):
+        return fitz.open(pdf.path, filetype="pdf")
+    return fitz.open(stream=pdf, filetype="pdf")
+
+
+class UploadSpool:
+    """Spools uploads to SPOOL_DIR; an upload already seen is not hashed again."""
+
+    def __init__(self, spool_dir=SPOOL_DIR, max_bytes=SPOOL_MAX_BYTES, max_uploads=256):
+        self._spool_dir = spool_dir
+        self.max_bytes = max_bytes
+        self.max_uploads = max_uploads
+        self._by_upload = OrderedDict()  # uploader file_id -> SpooledPDF
+        self._lock = threading.Lock()
+
+    @property
+    def spool_dir(self):
+        """The spool directory, created (and checked) on first use."""
+        with self._lock:
+            if self._spool_dir is None:
+                self._spool_dir = tempfile.mkdtemp(prefix="resultpy-uploads-")
+                atexit.register(shutil.rmtree, self._spool_dir, ignore_errors=True)
+            else:
+                private_dir(self._spool_dir)
+            return self._spool_dir
+
+    def spool(self, upload):
+        """SpooledPDF for a Streamlit UploadedFile (or any BytesIO)."""
+        file_id = getattr(upload, "file_id", None)
+        with self._lock:
+            spooled = self._by_upload.get(file_id) if file_id else None
+            if spooled is not None and os.path.exists(spooled.path):
+                self._by_upload.move_to_end(file_id)
+                return spooled
+
+        buffer = upload.getbuffer()
+        try:
+            spooled = self._write(buffer)
+        finally:
+            buffer.release()
+
+        if file_id:
+            with self._lock:
+                self._by_upload[file_id] = spooled
+                while len(self._by_upload) > self.max_uploads:
+                    self._by_upload.popitem(last=False)
+        return spooled
+
+    def _write(self, buffer):
+        sha = hashlib.sha256()
+        for start in range(0, len(buffer), HASH_CHUNK):
+            sha.update(buffer[start:start + HASH_CHUNK])
+        digest = sha.hexdigest()
+
+        spool_dir = self.spool_dir
+        path = os.path.join(spool_dir, f"{digest}.pdf")
+        if self._matches(path, digest, len(buffer)):
+            os.utime(path)  # mark as recently used for eviction
+        else:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(buffer)
+            os.replace(tmp_path, path)
+            self._evict(spool_dir, keep=path)
+        return SpooledPDF(path, digest, len(buffer))
+
+    @staticmethod
+    def _matches(path, digest, size):
+        """Whether an existing spooled file really holds this upload."""
+        try:
+            if os.path.getsize(path) != size:
+                return False
+            return file_digest(path) == (digest, size)
+        except OSError:
+            return False
+
+    def _evict(self, spool_dir, keep):
+        entries = []
+        for name in os.listdir(spool_dir):
+            path = os.path.join(spool_dir, name)
+            if not name.endswith(".pdf") or path == keep:
+                continue
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                # A job that already opened the file keeps reading it after unlink
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+# One spool per server process
+SPOOL = UploadSpool()
+
+
+def spool_upload(upload):
+    return SPOOL.spool(upload)